@@ -6,7 +6,12 @@ import logfire
 from fastapi import FastAPI
 
 from app.core.config import LOGFIRE_ENVIRONMENT, LOGFIRE_SERVICE_NAME
-from app.database import dispose_database, initialize_database, setup_notifications
+from app.database import (
+    dispose_database,
+    initialize_database,
+    monitor_replica,
+    setup_notifications,
+)
 from app.service import listen, warmup
 from app.service.search.client import dispose_elastic, initialize_elastic
 
@@ -34,7 +39,7 @@ async def lifespan(_app: FastAPI) -> AsyncGenerator[None]:
 
         await warmup()
 
-    listen_task = asyncio.create_task(listen())
+    background_tasks = [asyncio.create_task(listen()), asyncio.create_task(monitor_replica())]
 
     yield
 
@@ -42,6 +47,7 @@ async def lifespan(_app: FastAPI) -> AsyncGenerator[None]:
         await dispose_database()
         await dispose_elastic()
 
-        listen_task.cancel()
-        with suppress(asyncio.CancelledError):
-            await listen_task
+        for task in background_tasks:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
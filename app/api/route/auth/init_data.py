@@ -1,3 +1,5 @@
+import hashlib
+import time
 from typing import Annotated
 
 from fastapi import Depends
@@ -5,14 +7,25 @@ from fastapi.security import HTTPAuthorizationCredentials
 from init_data_py import InitData
 from init_data_py.errors.errors import InitDataPyError
 
-from app.core.config import INIT_DATA_SCHEME_NAME
+from app.core.config import (
+    BOT_TOKEN,
+    INIT_DATA_CACHE_SIZE,
+    INIT_DATA_LIFETIME,
+    INIT_DATA_SCHEME_NAME,
+)
 from app.core.exceptions import InitDataForbiddenError, InitDataUnauthorizedError
 from app.model import AuthenticatedUser, AuthenticatedUserWithCollectionIds, User, UserCreate
 from app.service import UserService
+from app.util import TTLCache
 
-from ..dependencies import DatabaseTransaction
+from ..dependencies import DatabasePrimaryReadonlySession, DatabaseTransaction
 from .config import AuthConfig
 
+# credentials hash -> init-data, kept until it expires
+_init_data_cache: TTLCache[bytes, InitData] = TTLCache(
+    "init_data", max_size=INIT_DATA_CACHE_SIZE, ttl=INIT_DATA_LIFETIME
+)
+
 
 async def validate_init_data(
     auth: Annotated[HTTPAuthorizationCredentials | None, Depends(AuthConfig.init_data_scheme)],
@@ -20,15 +33,26 @@ async def validate_init_data(
     if auth is None or auth.scheme != INIT_DATA_SCHEME_NAME:
         raise InitDataUnauthorizedError
 
+    cache_key = hashlib.sha256(auth.credentials.encode()).digest()
+
+    if (cached := _init_data_cache.get(cache_key)) is not None:
+        return cached
+
     try:
         init_data = InitData.parse(auth.credentials)
-        # init_data.validate(bot_token=BOT_TOKEN, raise_error=True)
+
+        if BOT_TOKEN is not None:  # allows running locally without a bot
+            init_data.validate(bot_token=BOT_TOKEN, lifetime=INIT_DATA_LIFETIME, raise_error=True)
     except InitDataPyError as e:
         raise InitDataForbiddenError from e
 
     if not init_data.user:
         raise InitDataForbiddenError
 
+    if init_data.auth_date is not None:
+        expires_in = init_data.auth_date + INIT_DATA_LIFETIME - time.time()
+        _init_data_cache.set(cache_key, init_data, ttl=expires_in)
+
     return init_data
 
 
@@ -49,7 +73,7 @@ async def get_full_user(init_data: ValidInitData, session: DatabaseTransaction)
 
 
 async def get_authenticated_user(
-    init_data: ValidInitData, session: DatabaseTransaction
+    init_data: ValidInitData, session: DatabasePrimaryReadonlySession
 ) -> AuthenticatedUser:
     user = await UserService.get_authenticated(session=session, telegram_id=init_data.user.id)
 
@@ -60,7 +84,7 @@ async def get_authenticated_user(
 
 
 async def get_authenticated_user_with_collection_ids(
-    init_data: ValidInitData, session: DatabaseTransaction
+    init_data: ValidInitData, session: DatabasePrimaryReadonlySession
 ) -> AuthenticatedUserWithCollectionIds:
     user = await UserService.get_authenticated_with_collection_ids(
         session=session, telegram_id=init_data.user.id
@@ -1,4 +1,9 @@
-__all__ = ["DatabaseReadonlySession", "DatabaseTransaction", "Pagination"]
+__all__ = [
+    "DatabasePrimaryReadonlySession",
+    "DatabaseReadonlySession",
+    "DatabaseTransaction",
+    "Pagination",
+]
 
-from .database import DatabaseReadonlySession, DatabaseTransaction
+from .database import DatabasePrimaryReadonlySession, DatabaseReadonlySession, DatabaseTransaction
 from .pagination import Pagination
@@ -3,7 +3,13 @@ from typing import Annotated
 from fastapi import Depends
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.database import spawn_readonly_session, spawn_session_with_transaction
+from app.database import (
+    spawn_primary_readonly_session,
+    spawn_readonly_session,
+    spawn_session_with_transaction,
+)
 
 DatabaseReadonlySession = Annotated[AsyncSession, Depends(spawn_readonly_session)]
+# for reads filling caches, which are invalidated as soon as the primary commits
+DatabasePrimaryReadonlySession = Annotated[AsyncSession, Depends(spawn_primary_readonly_session)]
 DatabaseTransaction = Annotated[AsyncSession, Depends(spawn_session_with_transaction)]
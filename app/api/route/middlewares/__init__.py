@@ -4,7 +4,7 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
 
-from app.core.config import ALLOW_ORIGINS
+from app.core.config import ALLOW_ORIGINS, SEARCH_CURSOR_HEADER
 
 
 def register_middlewares(app: FastAPI) -> None:
@@ -14,5 +14,6 @@ def register_middlewares(app: FastAPI) -> None:
         allow_credentials=False,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[SEARCH_CURSOR_HEADER],
     )
     app.add_middleware(GZipMiddleware)
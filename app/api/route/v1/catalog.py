@@ -1,14 +1,28 @@
+from itertools import chain
+from typing import Annotated
 from uuid import UUID
 
-from fastapi import APIRouter, status
+from fastapi import APIRouter, Header, Query, Response, status
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.api.schema import SearchQuery, SearchSuggestionQuery
-from app.core.exceptions import ProductNotFoundError
-from app.model import BriefProductSchema, ProductSchema, SearchMeta
+from app.api.schema import SearchBatchQuery, SearchSuggestionQuery
+from app.core.config import SEARCH_CURSOR_HEADER, SEARCH_SOURCE_CARDS
+from app.core.exceptions import (
+    ProductNotFoundError,
+    SearchCursorInvalidError,
+    SearchUnavailableError,
+)
+from app.model import (
+    BriefProductSchema,
+    ProductSchema,
+    SearchMeta,
+    SearchQuery,
+    SearchResult,
+)
 from app.service import CollectionService, ProductService, SearchService
 
 from ..auth import InitDataUser
-from ..dependencies import DatabaseTransaction, Pagination
+from ..dependencies import DatabaseReadonlySession, Pagination
 from ..util import build_responses
 
 catalog_router = APIRouter(prefix="/catalog", tags=["catalog"])
@@ -24,7 +38,7 @@ catalog_router = APIRouter(prefix="/catalog", tags=["catalog"])
 async def get_product(
     product_id: UUID,
     user: InitDataUser,
-    session: DatabaseTransaction,
+    session: DatabaseReadonlySession,
 ) -> ...:
     product = await ProductService.get_by_id(session=session, product_id=product_id)
     await CollectionService.fill_product_inclusion(
@@ -34,45 +48,115 @@ async def get_product(
     return product
 
 
+type SearchCursorQuery = Annotated[
+    str | None,
+    Query(
+        description=(
+            "Enables cursor pagination (offset is ignored): pass an empty string to start, "
+            f"then the value of the `{SEARCH_CURSOR_HEADER}` response header "
+            "to get the next page (the header is absent on the last page)"
+        ),
+    ),
+]
+
+
 @catalog_router.post(
     "/search",
     response_model=list[BriefProductSchema],
     status_code=status.HTTP_200_OK,
-    responses=build_responses(include_auth=True),
+    responses=build_responses(SearchCursorInvalidError, SearchUnavailableError, include_auth=True),
     summary="Search products",
 )
 async def search_catalog(
     query: SearchQuery,
     pagination: Pagination,
     user: InitDataUser,
-    session: DatabaseTransaction,
+    session: DatabaseReadonlySession,
+    response: Response,
+    cursor: SearchCursorQuery = None,
 ) -> ...:
-    product_ids = await SearchService.search_products(
+    result = await _search_catalog(
+        query=query,
+        pagination=pagination,
         user_id=user.id,
-        query=query.query,
-        categories=query.categories,
-        colors=query.colors,
-        brands=query.brands,
-        sizes=query.sizes,
-        min_price=query.min_price,
-        max_price=query.max_price,
+        session=session,
+        response=response,
+        cursor=cursor,
+        facets=False,
+    )
+
+    return result.items
+
+
+@catalog_router.post(
+    "/search/faceted",
+    response_model=SearchResult[BriefProductSchema],
+    status_code=status.HTTP_200_OK,
+    responses=build_responses(SearchCursorInvalidError, SearchUnavailableError, include_auth=True),
+    summary="Search products with filter value counts",
+)
+async def search_catalog_faceted(
+    query: SearchQuery,
+    pagination: Pagination,
+    user: InitDataUser,
+    session: DatabaseReadonlySession,
+    response: Response,
+    cursor: SearchCursorQuery = None,
+) -> ...:
+    return await _search_catalog(
+        query=query,
+        pagination=pagination,
+        user_id=user.id,
+        session=session,
+        response=response,
+        cursor=cursor,
+        facets=True,
+    )
+
+
+@catalog_router.post(
+    "/search/batch",
+    response_model=list[list[BriefProductSchema]],
+    status_code=status.HTTP_200_OK,
+    responses=build_responses(SearchUnavailableError, include_auth=True),
+    summary="Search products for several queries at once",
+)
+async def search_catalog_batch(
+    query: SearchBatchQuery,
+    pagination: Pagination,
+    user: InitDataUser,
+    session: DatabaseReadonlySession,
+) -> ...:
+    product_ids_batch = await SearchService.search_products_batch(
+        user_id=user.id,
+        search_queries=query.queries,
         limit=pagination.limit,
         offset=pagination.offset,
     )
-    products = await ProductService.get_many_by_ids(session=session, product_ids=product_ids)
+
+    products = await ProductService.get_many_by_ids(
+        session=session,
+        product_ids=list(dict.fromkeys(chain.from_iterable(product_ids_batch))),
+    )
     await CollectionService.fill_product_inclusion(
         session=session,
         products=products,
         user_id=user.id,
     )
 
-    return products
+    products_by_id = {product.id: product for product in products}
+
+    return [
+        [products_by_id[product_id] for product_id in product_ids if product_id in products_by_id]
+        for product_ids in product_ids_batch
+    ]
 
 
 @catalog_router.post(
     "/search/suggestions",
     response_model=list[str],
     status_code=status.HTTP_200_OK,
+    responses=build_responses(SearchUnavailableError),
     summary="Get search suggestions",
 )
 async def search_suggestions(query: SearchSuggestionQuery) -> ...:
@@ -83,7 +167,69 @@ async def search_suggestions(query: SearchSuggestionQuery) -> ...:
     "/search/meta",
     response_model=SearchMeta,
     status_code=status.HTTP_200_OK,
+    responses={
+        status.HTTP_304_NOT_MODIFIED: {
+            "description": "Metadata has not changed since the ETag passed in `If-None-Match`"
+        }
+    },
     summary="Get search metadata",
 )
-async def get_search_meta() -> ...:
-    return await SearchService.get_meta()
+async def get_search_meta(
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> ...:
+    snapshot = SearchService.get_meta()
+    headers = {"ETag": snapshot.etag, "Cache-Control": "no-cache"}
+
+    if snapshot.matches(if_none_match):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return Response(content=snapshot.body, media_type="application/json", headers=headers)
+
+
+async def _search_catalog(
+    query: SearchQuery,
+    pagination: Pagination,
+    user_id: int,
+    session: AsyncSession,
+    response: Response,
+    cursor: str | None,
+    *,
+    facets: bool,
+) -> SearchResult[BriefProductSchema]:
+    if SEARCH_SOURCE_CARDS:
+        result = await SearchService.search_product_cards(
+            session=session,
+            user_id=user_id,
+            search_query=query,
+            limit=pagination.limit,
+            offset=pagination.offset,
+            cursor=cursor,
+            facets=facets,
+        )
+    else:
+        id_result = await SearchService.search_products(
+            user_id=user_id,
+            search_query=query,
+            limit=pagination.limit,
+            offset=pagination.offset,
+            cursor=cursor,
+            facets=facets,
+        )
+        result = SearchResult(
+            items=await ProductService.get_many_by_ids(
+                session=session, product_ids=id_result.items
+            ),
+            next_cursor=id_result.next_cursor,
+            facets=id_result.facets,
+        )
+
+    await CollectionService.fill_product_inclusion(
+        session=session,
+        products=result.items,
+        user_id=user_id,
+    )
+
+    if result.next_cursor is not None:
+        response.headers[SEARCH_CURSOR_HEADER] = result.next_cursor
+
+    return result
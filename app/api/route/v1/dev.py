@@ -3,10 +3,13 @@ from typing import Annotated
 
 from fastapi import APIRouter, Body, status
 
+from app.core.config import SEARCH_SYNC_BATCH_SIZE, SEARCH_SYNC_CONCURRENCY
+from app.core.exceptions import SearchReindexInProgressError
+from app.model import SearchSyncReport
 from app.service import SearchService
 
 from ..auth import DevAPIKey
-from ..dependencies import DatabaseReadonlySession
+from ..dependencies import DatabaseTransaction
 from ..util import build_responses
 
 dev_router = APIRouter(prefix="/dev", tags=["dev"], dependencies=[DevAPIKey])
@@ -16,15 +19,42 @@ dev_responses = build_responses(include_dev_auth=True)
 
 @dev_router.post(
     "/search/sync",
-    response_model=int,
+    response_model=SearchSyncReport,
     status_code=status.HTTP_201_CREATED,
     responses=dev_responses,
-    summary="Sync search index with database, return number of products synced",
+    summary="Sync search index with database, return sync report",
 )
 async def sync_search(
-    since: Annotated[datetime, Body(embed=True)], session: DatabaseReadonlySession
+    since: Annotated[datetime, Body(embed=True)],
+    session: DatabaseTransaction,  # products are streamed with a server-side cursor
+    batch_size: Annotated[int, Body(embed=True, gt=0)] = SEARCH_SYNC_BATCH_SIZE,
+    concurrency: Annotated[int, Body(embed=True, gt=0)] = SEARCH_SYNC_CONCURRENCY,
 ) -> ...:
-    return await SearchService.sync_products(session=session, since=since)
+    return await SearchService.sync_products(
+        session=session,
+        since=since,
+        batch_size=batch_size,
+        concurrency=concurrency,
+    )
+
+
+@dev_router.post(
+    "/search/reindex",
+    response_model=SearchSyncReport,
+    status_code=status.HTTP_201_CREATED,
+    responses=build_responses(SearchReindexInProgressError, include_dev_auth=True),
+    summary="Rebuild search index into a new version and switch to it, return sync report",
+)
+async def reindex_search(
+    session: DatabaseTransaction,  # products are streamed with a server-side cursor
+    batch_size: Annotated[int, Body(embed=True, gt=0)] = SEARCH_SYNC_BATCH_SIZE,
+    concurrency: Annotated[int, Body(embed=True, gt=0)] = SEARCH_SYNC_CONCURRENCY,
+) -> ...:
+    return await SearchService.reindex_products(
+        session=session,
+        batch_size=batch_size,
+        concurrency=concurrency,
+    )
 
 
 @dev_router.post(
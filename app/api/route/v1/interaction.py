@@ -5,9 +5,9 @@ from fastapi import APIRouter, Body, status
 
 from app.core.exceptions import ProductNotFoundError
 from app.model import InteractionType
-from app.service import CollectionService, InteractionService
+from app.service import InteractionService
 
-from ..auth import InitDataUserWithCollectionIds
+from ..auth import InitDataUser
 from ..dependencies import DatabaseTransaction
 from ..util import build_responses
 
@@ -24,7 +24,7 @@ interaction_router = APIRouter(prefix="/interaction", tags=["interaction"])
 async def record_product_interaction(
     product_id: UUID,
     interaction_type: Annotated[InteractionType, Body(embed=True)],
-    user: InitDataUserWithCollectionIds,
+    user: InitDataUser,
     session: DatabaseTransaction,
 ) -> ...:
     await InteractionService.record_product_interaction(
@@ -33,22 +33,3 @@ async def record_product_interaction(
         product_id=product_id,
         interaction_type=interaction_type,
     )
-
-    # syncing user's default collection
-    if interaction_type == InteractionType.LIKE:
-        await CollectionService.add_products(
-            session=session, user=user, collection_ids=[], product_ids=[product_id]
-        )
-    else:  # InteractionType.DISLIKE  # noqa: PLR5501
-        # if the product is included only to the default collection, remove it from there
-        if (
-            len(
-                await CollectionService.check_product_inclusion(
-                    session=session, user=user, product_id=product_id
-                )
-            )
-            == 1
-        ):
-            await CollectionService.delete_products(
-                session=session, user=user, collection_ids=[], product_ids=[product_id]
-            )
@@ -7,7 +7,7 @@ from app.model import UserPatch, UserSchema, UserWithPreferencesSchema
 from app.service import UserService
 
 from ..auth import InitDataUser, InitDataUserFull
-from ..dependencies import DatabaseTransaction
+from ..dependencies import DatabaseReadonlySession, DatabaseTransaction
 from ..util import build_responses
 
 user_router = APIRouter(prefix="/user", tags=["user"])
@@ -20,7 +20,7 @@ user_router = APIRouter(prefix="/user", tags=["user"])
     responses=build_responses(UserNotFoundError),
     summary="Get user by id",
 )
-async def get_user(user_id: int, session: DatabaseTransaction) -> ...:
+async def get_user(user_id: int, session: DatabaseReadonlySession) -> ...:
     return await UserService.get_by_id(session=session, user_id=user_id)
 
 
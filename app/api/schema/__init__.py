@@ -1,3 +1,3 @@
-__all__ = ["SearchQuery", "SearchSuggestionQuery"]
+__all__ = ["SearchBatchQuery", "SearchSuggestionQuery"]
 
-from .search import SearchQuery, SearchSuggestionQuery
+from .search import SearchBatchQuery, SearchSuggestionQuery
@@ -1,16 +1,13 @@
 from pydantic import BaseModel, Field
 
-
-class SearchQuery(BaseModel):
-    query: str | None = None
-    categories: list[str] | None = None
-    colors: list[str] | None = None
-    brands: list[str] | None = None
-    sizes: list[str] | None = None
-    min_price: float | None = Field(None, ge=0)
-    max_price: float | None = Field(None, ge=0)
+from app.core.config import SEARCH_BATCH_MAX_QUERIES
+from app.model import SearchQuery
 
 
 class SearchSuggestionQuery(BaseModel):
     query: str | None = None
     limit: int = Field(10, ge=1, le=100)
+
+
+class SearchBatchQuery(BaseModel):
+    queries: list[SearchQuery] = Field(min_length=1, max_length=SEARCH_BATCH_MAX_QUERIES)
@@ -10,6 +10,9 @@ APP_TITLE = "Look"
 INIT_DATA_SCHEME_NAME = "tma"
 INIT_DATA_DESCRIPTION = "Telegram MiniApp init-data"
 
+SEARCH_CURSOR_HEADER = "X-Next-Cursor"
+SEARCH_BATCH_MAX_QUERIES = 20
+
 
 class Defaults:
     collection_name = "__FAVOURITES__"
@@ -33,6 +36,8 @@ class SpecialUserIds:
 DEV_API_KEY = os.getenv("DEV_API_KEY")
 
 BOT_TOKEN = os.getenv("BOT_TOKEN")
+INIT_DATA_LIFETIME = int(os.getenv("INIT_DATA_LIFETIME", default="86400"))
+INIT_DATA_CACHE_SIZE = int(os.getenv("INIT_DATA_CACHE_SIZE", default="4096"))
 
 SQLALCHEMY_URL = URL.create(
     drivername="postgresql+asyncpg",
@@ -43,10 +48,49 @@ SQLALCHEMY_URL = URL.create(
     database=os.getenv("POSTGRES_DB"),
 )
 ASYNCPG_URL = SQLALCHEMY_URL.set(drivername="postgresql").render_as_string(hide_password=False)
+SQLALCHEMY_REPLICA_URL = (
+    SQLALCHEMY_URL.set(
+        host=os.getenv("POSTGRES_REPLICA_HOST"),
+        port=int(os.getenv("POSTGRES_REPLICA_PORT", default="5432")),
+    )
+    if os.getenv("POSTGRES_REPLICA_HOST")
+    else None
+)
+DATABASE_REPLICA_MAX_LAG = float(os.getenv("DATABASE_REPLICA_MAX_LAG", default="1"))
+DATABASE_REPLICA_CHECK_INTERVAL = float(os.getenv("DATABASE_REPLICA_CHECK_INTERVAL", default="5"))
+DATABASE_POOL_SIZE = int(os.getenv("DATABASE_POOL_SIZE", default="5"))
+DATABASE_POOL_MAX_OVERFLOW = int(os.getenv("DATABASE_POOL_MAX_OVERFLOW", default="5"))
+DATABASE_POOL_TIMEOUT = float(os.getenv("DATABASE_POOL_TIMEOUT", default="10"))
+DATABASE_POOL_RECYCLE = int(os.getenv("DATABASE_POOL_RECYCLE", default="1800"))
+DATABASE_POOL_PRE_PING = os.getenv("DATABASE_POOL_PRE_PING", default="false").lower() == "true"
+DATABASE_STATEMENT_CACHE_SIZE = int(os.getenv("DATABASE_STATEMENT_CACHE_SIZE", default="500"))
+DATABASE_READONLY_STATEMENT_TIMEOUT = float(
+    os.getenv("DATABASE_READONLY_STATEMENT_TIMEOUT", default="10")
+)
+DATABASE_TRANSACTION_STATEMENT_TIMEOUT = float(
+    os.getenv("DATABASE_TRANSACTION_STATEMENT_TIMEOUT", default="60")
+)
 
 ELASTIC_HOST = os.getenv("ELASTIC_HOST")
 ELASTIC_USERNAME = os.getenv("ELASTIC_USERNAME")
 ELASTIC_PASSWORD = os.getenv("ELASTIC_PASSWORD")
+ELASTIC_CONNECTIONS_PER_NODE = int(os.getenv("ELASTIC_CONNECTIONS_PER_NODE", default="10"))
+ELASTIC_SEARCH_TIMEOUT = float(os.getenv("ELASTIC_SEARCH_TIMEOUT", default="2"))
+ELASTIC_INDEXING_TIMEOUT = float(os.getenv("ELASTIC_INDEXING_TIMEOUT", default="60"))
+ELASTIC_MAX_RETRIES = int(os.getenv("ELASTIC_MAX_RETRIES", default="2"))
+ELASTIC_RETRY_BACKOFF = float(os.getenv("ELASTIC_RETRY_BACKOFF", default="0.1"))
+ELASTIC_HTTP_COMPRESS = os.getenv("ELASTIC_HTTP_COMPRESS", default="true").lower() == "true"
+
+SEARCH_SYNC_BATCH_SIZE = int(os.getenv("SEARCH_SYNC_BATCH_SIZE", default="500"))
+SEARCH_SYNC_CONCURRENCY = int(os.getenv("SEARCH_SYNC_CONCURRENCY", default="4"))
+SEARCH_INDEXER_DEBOUNCE = float(os.getenv("SEARCH_INDEXER_DEBOUNCE", default="2"))
+SEARCH_SOURCE_CARDS = os.getenv("SEARCH_SOURCE_CARDS", default="false").lower() == "true"
+SEARCH_CACHE_SIZE = int(os.getenv("SEARCH_CACHE_SIZE", default="1024"))
+SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", default="60"))
+SEARCH_PROFILE_TTL = float(os.getenv("SEARCH_PROFILE_TTL", default="300"))
+
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", default="2048"))
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", default="600"))
 
 LOGFIRE_SERVICE_NAME = os.getenv("LOGFIRE_SERVICE_NAME")
 LOGFIRE_ENVIRONMENT = os.getenv("LOGFIRE_ENVIRONMENT")
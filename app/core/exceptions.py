@@ -11,6 +11,15 @@ class AppError(Exception):
     headers: ClassVar[dict[str, str] | None] = None
 
 
+class BadRequestError(AppError):
+    status_code = status.HTTP_400_BAD_REQUEST
+    message = "Bad request"
+
+
+class SearchCursorInvalidError(BadRequestError):
+    message = "Search cursor invalid or expired"
+
+
 class UnauthorizedError(AppError):
     status_code = status.HTTP_401_UNAUTHORIZED
     message = "Unauthorized"
@@ -62,3 +71,22 @@ class ProductNotFoundError(NotFoundError):
 
 class CollectionNotFoundError(NotFoundError):
     message = "Collection not found"
+
+
+class ConflictError(AppError):
+    status_code = status.HTTP_409_CONFLICT
+    message = "Conflict"
+
+
+class SearchReindexInProgressError(ConflictError):
+    message = "Search reindex is already in progress"
+
+
+class ServiceUnavailableError(AppError):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    message = "Service unavailable"
+    headers: ClassVar = {"Retry-After": "1"}
+
+
+class SearchUnavailableError(ServiceUnavailableError):
+    message = "Search is temporarily unavailable"
@@ -1,54 +1,333 @@
 __all__ = [
+    "LeadershipLostError",
+    "acquire_leadership",
     "dispose_database",
+    "fetch",
     "initialize_database",
+    "is_replica_session",
+    "monitor_replica",
     "setup_notifications",
+    "spawn_primary_readonly_session",
     "spawn_readonly_session",
     "spawn_session_with_transaction",
+    "start_primary_readonly_session",
     "start_readonly_session",
     "start_transaction",
 ]
 
-from collections.abc import AsyncGenerator
+import asyncio
+import time
+from collections.abc import AsyncGenerator, Callable, Iterable
 from contextlib import asynccontextmanager
+from typing import Any, cast
 
 import asyncpg
 import logfire
 import pg_async_events
-from sqlalchemy.ext.asyncio import create_async_engine
+from opentelemetry.metrics import CallbackOptions, Observation
+from sqlalchemy import URL, text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry, QueuePool
 from sqlmodel import SQLModel
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.core.config import ASYNCPG_URL, SQLALCHEMY_URL
+from app.core.config import (
+    ASYNCPG_URL,
+    DATABASE_POOL_MAX_OVERFLOW,
+    DATABASE_POOL_PRE_PING,
+    DATABASE_POOL_RECYCLE,
+    DATABASE_POOL_SIZE,
+    DATABASE_POOL_TIMEOUT,
+    DATABASE_READONLY_STATEMENT_TIMEOUT,
+    DATABASE_REPLICA_CHECK_INTERVAL,
+    DATABASE_REPLICA_MAX_LAG,
+    DATABASE_STATEMENT_CACHE_SIZE,
+    DATABASE_TRANSACTION_STATEMENT_TIMEOUT,
+    SQLALCHEMY_REPLICA_URL,
+    SQLALCHEMY_URL,
+)
 
-_engine = create_async_engine(SQLALCHEMY_URL)
-logfire.instrument_sqlalchemy(_engine)
+_pool_wait_histogram = logfire.metric_histogram(
+    "database_pool_wait", unit="s", description="Time spent waiting for a pooled connection"
+)
+
+
+class _InstrumentedPool(AsyncAdaptedQueuePool):
+    """Connection pool recording time spent waiting for a connection, named by `logging_name`."""
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        started_at = time.perf_counter()
+
+        try:
+            return super()._do_get()
+        finally:
+            _pool_wait_histogram.record(
+                time.perf_counter() - started_at, {"pool": self.logging_name}
+            )
+
+
+def _create_engine(
+    name: str,
+    statement_timeout: float,
+    url: URL = SQLALCHEMY_URL,
+    **kwargs: Any,  # noqa: ANN401
+) -> AsyncEngine:
+    """Create an engine with its own pool, statement timeout is set once per connection."""
+    return create_async_engine(
+        url,
+        poolclass=_InstrumentedPool,
+        pool_logging_name=name,
+        pool_size=DATABASE_POOL_SIZE,
+        max_overflow=DATABASE_POOL_MAX_OVERFLOW,
+        pool_timeout=DATABASE_POOL_TIMEOUT,
+        pool_recycle=DATABASE_POOL_RECYCLE,
+        pool_pre_ping=DATABASE_POOL_PRE_PING,
+        connect_args={
+            "prepared_statement_cache_size": DATABASE_STATEMENT_CACHE_SIZE,
+            "server_settings": {"statement_timeout": str(int(statement_timeout * 1000))},
+        },
+        **kwargs,
+    )
+
+
+_engine = _create_engine("transaction", statement_timeout=DATABASE_TRANSACTION_STATEMENT_TIMEOUT)
+# read-only sessions run statements without BEGIN/COMMIT round trips
+_readonly_engine = _create_engine(
+    "readonly",
+    statement_timeout=DATABASE_READONLY_STATEMENT_TIMEOUT,
+    isolation_level="AUTOCOMMIT",
+)
+# optional, read-only sessions fall back to the primary when it is unavailable or lagging
+_replica_engine = (
+    _create_engine(
+        "replica",
+        statement_timeout=DATABASE_READONLY_STATEMENT_TIMEOUT,
+        url=SQLALCHEMY_REPLICA_URL,
+        isolation_level="AUTOCOMMIT",
+    )
+    if SQLALCHEMY_REPLICA_URL is not None
+    else None
+)
+_engines = [engine for engine in (_engine, _readonly_engine, _replica_engine) if engine is not None]
+logfire.instrument_sqlalchemy(engines=_engines)
+
+_replica_available = False  # updated by `monitor_replica`
+
+REPLICA_SESSION_INFO_KEY = "replica"
+
+
+def _observe_pools(
+    measure: Callable[[QueuePool], int],
+) -> Callable[[CallbackOptions], Iterable[Observation]]:
+    def callback(_options: CallbackOptions) -> Iterable[Observation]:
+        for engine in _engines:
+            pool = cast(QueuePool, engine.pool)
+            yield Observation(measure(pool), {"pool": pool.logging_name})
+
+    return callback
+
+
+logfire.metric_gauge_callback(
+    "database_pool_checked_out",
+    [_observe_pools(lambda pool: pool.checkedout())],
+    description="Pooled connections currently in use",
+)
+logfire.metric_gauge_callback(
+    "database_pool_overflow",
+    [_observe_pools(lambda pool: max(pool.overflow(), 0))],
+    description="Connections open beyond the pool size",
+)
+
+_notifications_pool: asyncpg.Pool
+
+SCHEMA_LOCK_NAME = "schema"
+LEADERSHIP_RETRY_INTERVAL = 10  # seconds
+LEADERSHIP_CHECK_INTERVAL = 5  # seconds, shorter than the retry interval of other workers
+LEADERSHIP_CHECK_TIMEOUT = 5  # seconds
+
+
+class LeadershipLostError(Exception):
+    """Connection holding the leadership was lost, another worker may be leading already."""
 
 
 async def initialize_database() -> None:
     async with _engine.begin() as connection:
+        # workers start simultaneously, concurrent DDL on the same objects fails
+        await connection.execute(
+            text("SELECT pg_advisory_xact_lock(hashtext(:name))"), {"name": SCHEMA_LOCK_NAME}
+        )
         await connection.run_sync(SQLModel.metadata.create_all)
 
 
 async def setup_notifications() -> None:
+    global _notifications_pool  # noqa: PLW0603
+
+    # one connection is held by the listener for good, the rest are for notifying
     # noinspection PyUnresolvedReferences
-    pool = await asyncpg.create_pool(ASYNCPG_URL, min_size=1, max_size=2)
-    await pg_async_events.initialize(pool)
+    _notifications_pool = await asyncpg.create_pool(ASYNCPG_URL, min_size=1, max_size=3)
+    await pg_async_events.initialize(_notifications_pool)
+
+
+@asynccontextmanager
+async def acquire_leadership(name: str) -> AsyncGenerator[None]:
+    """
+    Wait until this process becomes the only holder of the named leadership across all workers.
+
+    Leadership is a session-level advisory lock, released on exit or when the connection is lost.
+    Each leadership holds its own connection, so it never takes one from the notifications pool.
+    The connection is checked periodically, once it is lost the body is cancelled
+    and `LeadershipLostError` is raised, so the caller can compete for leadership again.
+    """
+    connection = await asyncpg.connect(ASYNCPG_URL)
+    leader_task = asyncio.current_task()
+    lost = False
+
+    async def watch() -> None:
+        nonlocal lost
+
+        while True:
+            await asyncio.sleep(LEADERSHIP_CHECK_INTERVAL)
+
+            try:
+                await connection.fetchval("SELECT 1", timeout=LEADERSHIP_CHECK_TIMEOUT)
+            except (asyncpg.PostgresError, asyncpg.InterfaceError, OSError, TimeoutError):
+                break
+
+        lost = True
+        leader_task.cancel()
+
+    try:
+        while True:
+            if await connection.fetchval("SELECT pg_try_advisory_lock(hashtext($1))", name):
+                break
+
+            await asyncio.sleep(LEADERSHIP_RETRY_INTERVAL)
+
+        watcher = asyncio.create_task(watch())
+
+        try:
+            yield
+        except asyncio.CancelledError:
+            if lost and leader_task.uncancel() == 0:  # cancelled by the watcher only
+                raise LeadershipLostError(name) from None
+            raise
+        finally:
+            watcher.cancel()
+    finally:
+        if lost:
+            connection.terminate()
+        else:
+            await connection.close()  # releases the lock
+
+
+async def monitor_replica() -> None:
+    """Periodically check replica health and lag, routing read-only sessions accordingly."""
+    global _replica_available  # noqa: PLW0603
+
+    if _replica_engine is None:
+        return
+
+    while True:
+        lag = await _measure_replica_lag(_replica_engine)
+        available = lag is not None and lag <= DATABASE_REPLICA_MAX_LAG
+
+        if available != _replica_available:
+            _replica_available = available
+
+            if available:
+                logfire.info("Read replica is available, lag {lag}s", lag=lag)
+            else:
+                logfire.warn("Read replica is unavailable, lag {lag}s", lag=lag)
+
+        await asyncio.sleep(DATABASE_REPLICA_CHECK_INTERVAL)
+
+
+async def _measure_replica_lag(engine: AsyncEngine) -> float | None:
+    """:return: seconds the replica is behind the primary, `None` if it is unreachable"""
+    # replay timestamp stands still while the primary is idle, a caught up replica is not lagging
+    statement = text(
+        """
+        SELECT CASE
+            WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn()
+            THEN 0
+            ELSE coalesce(extract(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+        END
+        """
+    )
+
+    try:
+        async with asyncio.timeout(DATABASE_REPLICA_CHECK_INTERVAL), engine.connect() as connection:
+            return float((await connection.execute(statement)).scalar_one())
+    except Exception:
+        logfire.debug("Read replica health check failed", _exc_info=True)
+        return None
 
 
 async def dispose_database() -> None:
-    await _engine.dispose()
+    for engine in _engines:
+        await engine.dispose()
+
+
+class _ReadonlySession(AsyncSession):
+    """
+    Session for reading only, holding a pooled connection just for the duration of a statement.
+
+    - statements run in autocommit mode, each one sees its own snapshot
+    - rows are fetched before the connection is released, so results stay usable
+    - server-side cursors (`stream`, `stream_scalars`) need a transaction and do not work here
+    """
+
+    async def exec(self, *args: Any, **kwargs: Any) -> Any:  # noqa: ANN401
+        try:
+            return await super().exec(*args, **kwargs)
+        finally:
+            await self.commit()  # nothing to commit, just returns the connection to the pool
+
+
+async def fetch(session: AsyncSession, query: str, *args: Any) -> list[asyncpg.Record]:  # noqa: ANN401
+    """
+    Run a raw query on the session connection, skipping ORM and result processing.
+
+    Meant for the hottest simple reads, the query is prepared once per connection by asyncpg.
+    Runs in the session transaction if one has already begun.
+    """
+    connection = await session.connection()
+    raw_connection = await connection.get_raw_connection()
+
+    try:
+        return await raw_connection.driver_connection.fetch(query, *args)
+    finally:
+        if isinstance(session, _ReadonlySession):
+            await session.commit()  # same as after ORM statements, returns the connection
+
+
+def is_replica_session(session: AsyncSession) -> bool:
+    """:return: whether the session reads from a replica, possibly lagging behind the primary"""
+    return session.info.get(REPLICA_SESSION_INFO_KEY, False)
 
 
 async def spawn_readonly_session() -> AsyncGenerator[AsyncSession]:
-    async with AsyncSession(_engine) as session:
+    """Read-only session served by the replica when it is available."""
+    replica = _replica_engine is not None and _replica_available
+    engine = _replica_engine if replica else _readonly_engine
+
+    async with _ReadonlySession(engine, expire_on_commit=False) as session:
+        session.info[REPLICA_SESSION_INFO_KEY] = replica
+        yield session
+
+
+async def spawn_primary_readonly_session() -> AsyncGenerator[AsyncSession]:
+    """Read-only session always served by the primary, for reads that must not lag behind."""
+    async with _ReadonlySession(_readonly_engine, expire_on_commit=False) as session:
         yield session
-        await session.rollback()
 
 
 async def spawn_session_with_transaction() -> AsyncGenerator[AsyncSession]:
+    # connection is checked out on the first statement, not on BEGIN
     async with AsyncSession(_engine) as session, session.begin():
         yield session
 
 
 start_readonly_session = asynccontextmanager(spawn_readonly_session)
+start_primary_readonly_session = asynccontextmanager(spawn_primary_readonly_session)
 start_transaction = asynccontextmanager(spawn_session_with_transaction)
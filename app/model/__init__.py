@@ -1,4 +1,6 @@
 __all__ = [
+    "BRIEF_PRODUCT_FIELDS",
+    "PRODUCT_CHANGE_NOTIFICATION_CHANNEL",
     "AuthenticatedUser",
     "AuthenticatedUserWithCollectionIds",
     "BriefCollectionSchema",
@@ -14,7 +16,14 @@ __all__ = [
     "InteractionType",
     "Product",
     "ProductSchema",
+    "SearchFacetBucket",
+    "SearchFacets",
     "SearchMeta",
+    "SearchPriceBucket",
+    "SearchQuery",
+    "SearchResult",
+    "SearchSyncBatchFailure",
+    "SearchSyncReport",
     "User",
     "UserCartLink",
     "UserCreate",
@@ -23,7 +32,13 @@ __all__ = [
     "UserWithPreferencesSchema",
 ]
 
-from .catalog import BriefProductSchema, Product, ProductSchema
+from .catalog import (
+    BRIEF_PRODUCT_FIELDS,
+    PRODUCT_CHANGE_NOTIFICATION_CHANNEL,
+    BriefProductSchema,
+    Product,
+    ProductSchema,
+)
 from .collection import (
     BriefCollectionSchema,
     Collection,
@@ -34,7 +49,16 @@ from .collection import (
     CollectionSchemaWithOwner,
 )
 from .interaction import Interaction, InteractionType
-from .misc import SearchMeta
+from .misc import (
+    SearchFacetBucket,
+    SearchFacets,
+    SearchMeta,
+    SearchPriceBucket,
+    SearchQuery,
+    SearchResult,
+    SearchSyncBatchFailure,
+    SearchSyncReport,
+)
 from .user import (
     AuthenticatedUser,
     AuthenticatedUserWithCollectionIds,
@@ -2,7 +2,7 @@ from datetime import datetime
 from uuid import UUID
 
 from pydantic import PrivateAttr
-from sqlalchemy import Column, DateTime, String, func, text
+from sqlalchemy import DDL, Column, DateTime, String, event, func, text
 from sqlalchemy.dialects.postgresql import ARRAY, JSONB
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.orm import relationship as sa_relationship
@@ -76,6 +76,9 @@ class _BriefProductBase(SQLModel):
     )
 
 
+BRIEF_PRODUCT_FIELDS = tuple(_BriefProductBase.model_fields)
+
+
 # noinspection PyTypeChecker
 class _ProductBase(_BriefProductBase):
     original_url: str = Field(nullable=False)
@@ -119,3 +122,59 @@ class BriefProductSchema(_ProductSchemaExtra, _BriefProductBase):
 
 class ProductSchema(_ProductSchemaExtra, _ProductBase):
     color_group: list[ProductColorGroupSchema] = []
+
+
+# TRIGGERS
+
+PRODUCT_CHANGE_NOTIFICATION_CHANNEL = "product_change"
+
+_PRODUCT_TRIGGERS_DDL = (
+    # `server_onupdate` only covers ORM writes, so `updated_at` is maintained by the database
+    """
+    CREATE OR REPLACE FUNCTION touch_updated_at() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        NEW.updated_at := now();
+        RETURN NEW;
+    END;
+    $$
+    """,
+    """
+    CREATE OR REPLACE TRIGGER product_touch_updated_at
+    BEFORE UPDATE ON product
+    FOR EACH ROW EXECUTE FUNCTION touch_updated_at()
+    """,
+    # arguments: notification channel, name of the column holding product ID
+    """
+    CREATE OR REPLACE FUNCTION notify_product_change() RETURNS trigger LANGUAGE plpgsql AS $$
+    DECLARE
+        changed_row jsonb;
+    BEGIN
+        IF TG_OP = 'DELETE' THEN
+            changed_row := to_jsonb(OLD);
+        ELSE
+            changed_row := to_jsonb(NEW);
+        END IF;
+
+        PERFORM pg_notify(TG_ARGV[0], to_json(changed_row ->> TG_ARGV[1])::text);
+        RETURN NULL;
+    END;
+    $$
+    """,
+    f"""
+    CREATE OR REPLACE TRIGGER product_notify_change
+    AFTER INSERT OR UPDATE OR DELETE ON product
+    FOR EACH ROW EXECUTE FUNCTION notify_product_change(
+        '{PRODUCT_CHANGE_NOTIFICATION_CHANNEL}', 'id'
+    )
+    """,
+    f"""
+    CREATE OR REPLACE TRIGGER product_color_group_notify_change
+    AFTER INSERT OR UPDATE OR DELETE ON product_color_group
+    FOR EACH ROW EXECUTE FUNCTION notify_product_change(
+        '{PRODUCT_CHANGE_NOTIFICATION_CHANNEL}', 'product_id'
+    )
+    """,
+)
+
+for _statement in _PRODUCT_TRIGGERS_DDL:
+    event.listen(SQLModel.metadata, "after_create", DDL(_statement))
@@ -1,6 +1,8 @@
+from datetime import datetime
 from enum import StrEnum
 from uuid import UUID
 
+from sqlalchemy import DDL, Column, DateTime, event, func
 from sqlalchemy import Enum as SAEnum
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlmodel import Field, SQLModel
@@ -24,3 +26,23 @@ class Interaction(SQLModel, table=True):
     )
 
     interaction_type: InteractionType = Field(sa_type=SAEnum(InteractionType), nullable=False)
+
+    updated_at: datetime | None = Field(
+        sa_column=Column(
+            DateTime(timezone=True),
+            server_default=func.now(),
+            nullable=False,
+        ),
+        default=None,
+    )
+
+
+# MIGRATIONS
+
+# `create_all` skips existing tables, so columns added later are created here
+_INTERACTION_MIGRATION_DDL = """
+    ALTER TABLE interaction
+    ADD COLUMN IF NOT EXISTS updated_at timestamptz NOT NULL DEFAULT now()
+"""
+
+event.listen(SQLModel.metadata, "after_create", DDL(_INTERACTION_MIGRATION_DDL))
@@ -1,7 +1,63 @@
 from pydantic import BaseModel, Field
 
 
+class SearchQuery(BaseModel):
+    query: str | None = None
+    categories: list[str] | None = None
+    colors: list[str] | None = None
+    brands: list[str] | None = None
+    sizes: list[str] | None = None
+    min_price: float | None = Field(None, ge=0)
+    max_price: float | None = Field(None, ge=0)
+
+
+class SearchFacetBucket(BaseModel):
+    value: str
+    count: int = Field(description="Number of matching products with this value")
+
+
+class SearchPriceBucket(BaseModel):
+    min_price: float = Field(description="Lower bound of the price range (inclusive)")
+    count: int = Field(description="Number of matching products in the price range")
+
+
+class SearchFacets(BaseModel):
+    brands: list[SearchFacetBucket]
+    categories: list[SearchFacetBucket]
+    colors: list[SearchFacetBucket]
+    sizes: list[SearchFacetBucket]
+    price_histogram: list[SearchPriceBucket]
+    min_price: float | None = Field(description="Lowest price among matching products")
+    max_price: float | None = Field(description="Highest price among matching products")
+
+
+class SearchResult[T](BaseModel):
+    items: list[T]
+    next_cursor: str | None = Field(None, description="Cursor of the next page, if there is one")
+    facets: SearchFacets | None = Field(
+        None, description="Filter values of all matching products (not only the current page)"
+    )
+
+
 class SearchMeta(BaseModel):
     brands: list[str]
     categories: list[str]
     colors: dict[str, str] = Field(description="Mapping of color names to their hex codes")
+    sizes: list[str]
+    min_price: float | None = None
+    max_price: float | None = None
+
+
+class SearchSyncBatchFailure(BaseModel):
+    batch: int = Field(description="Zero-based number of the batch")
+    failed: int = Field(description="Number of documents from the batch that were not indexed")
+    errors: list[str] = Field(description="Sample of error messages reported for the batch")
+
+
+class SearchSyncReport(BaseModel):
+    synced: int = Field(description="Number of documents indexed successfully")
+    failed: int = Field(description="Number of documents that were not indexed")
+    batches: int
+    failed_batches: list[SearchSyncBatchFailure]
+    duration: float = Field(description="Total sync duration in seconds")
+    throughput: float = Field(description="Indexed documents per second")
@@ -10,6 +10,7 @@ __all__ = [
 
 import asyncio
 
+from .cache import cache_invalidation_listener
 from .collection import CollectionService
 from .interaction import InteractionService
 from .product import ProductService
@@ -18,10 +19,16 @@ from .user import UserService
 
 
 async def warmup() -> None:
-    await SearchService.handle_meta_refresh_notification()
+    await SearchService.load_meta()
+    await SearchService.refresh_product_lookups()
 
 
 async def listen() -> None:
     await asyncio.gather(
         SearchService.meta_refresh_listener(),
+        SearchService.meta_listener(),
+        SearchService.products_indexed_listener(),
+        SearchService.product_interaction_listener(),
+        SearchService.product_change_listener(),
+        cache_invalidation_listener(),
     )
@@ -0,0 +1,75 @@
+import json
+from collections.abc import Iterable
+from typing import ClassVar
+
+import logfire
+import pg_async_events
+from sqlmodel import func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.database import is_replica_session
+from app.util import TTLCache
+
+CACHE_INVALIDATION_NOTIFICATION_CHANNEL = "cache_invalidation"
+
+
+class SharedCache[K: int | str, V](TTLCache[K, V]):
+    """
+    In-process LRU cache with expiring entries, invalidated on every worker at once.
+
+    - invalidation is sent inside the caller's transaction and delivered once it is committed
+    - every worker drops the invalidated keys in `cache_invalidation_listener`
+    - keys must be JSON-serializable, as they travel in notification payloads
+    - cache names must be unique
+    """
+
+    _registry: ClassVar[dict[str, "SharedCache"]] = {}
+
+    def __init__(self, name: str, max_size: int, ttl: float) -> None:
+        super().__init__(name=name, max_size=max_size, ttl=ttl)
+
+        self._registry[name] = self
+
+    def set_loaded(self, session: AsyncSession, key: K, value: V) -> None:
+        """
+        Cache value loaded with the session, unless it was read from a replica.
+
+        A lagging replica may still return a state invalidated on the primary,
+        caching it would outlive the invalidation.
+        """
+        if not is_replica_session(session):
+            self.set(key, value)
+
+    @logfire.instrument
+    async def invalidate(self, session: AsyncSession, keys: Iterable[K]) -> None:
+        """Drop keys locally right away and on every worker once the transaction is committed."""
+        keys = list(keys)
+
+        for key in keys:
+            self.pop(key)
+
+        payload = {"cache": self.name, "keys": keys}
+
+        await session.exec(
+            select(func.pg_notify(CACHE_INVALIDATION_NOTIFICATION_CHANNEL, json.dumps(payload)))
+        )
+
+    @classmethod
+    def handle_invalidation_notification(cls, cache_name: str, keys: Iterable[K]) -> None:
+        cache = cls._registry.get(cache_name)
+
+        if cache is None:  # cache is not used by this version of the app
+            return
+
+        for key in keys:
+            cache.pop(key)
+
+
+async def cache_invalidation_listener() -> None:
+    async for notification in pg_async_events.subscribe(CACHE_INVALIDATION_NOTIFICATION_CHANNEL):
+        try:
+            SharedCache.handle_invalidation_notification(
+                cache_name=notification["cache"], keys=notification["keys"]
+            )
+        except Exception:
+            logfire.exception("Failed to invalidate cache")
@@ -1,5 +1,4 @@
 from collections.abc import Sequence
-from typing import ClassVar
 from uuid import UUID
 
 import logfire
@@ -9,10 +8,12 @@ from sqlalchemy.orm import joinedload, selectinload
 from sqlmodel import delete, select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.core.config import Defaults
+from app.core.config import USER_CACHE_SIZE, USER_CACHE_TTL, Defaults
 from app.core.exceptions import CollectionForbiddenError, CollectionNotFoundError
+from app.database import fetch
 from app.model import (
     AuthenticatedUserWithCollectionIds,
+    BriefProductSchema,
     Collection,
     CollectionCreate,
     CollectionPatch,
@@ -20,18 +21,34 @@ from app.model import (
     Product,
 )
 
+from .cache import SharedCache
 from .util import check_update_needed
 
+_PRODUCT_INCLUSION_QUERY = f"""
+    SELECT collection_id FROM {CollectionProductLink.__tablename__}
+    WHERE product_id = $1 AND collection_id = ANY($2::uuid[])
+"""  # noqa: S608
+_PRODUCTS_IN_COLLECTION_QUERY = f"""
+    SELECT product_id FROM {CollectionProductLink.__tablename__}
+    WHERE collection_id = $1 AND product_id = ANY($2::uuid[])
+"""  # noqa: S608
+
 
 # noinspection PyTypeChecker,PyUnresolvedReferences,Pydantic
 class CollectionService:
-    _default_collection_cache: ClassVar[dict[int, UUID]] = {}
-    _DEFAULT_CACHE_MAX_SIZE = 2048
+    # user_id -> default collection id
+    default_collection_cache: SharedCache[int, UUID] = SharedCache(
+        "default_collection", max_size=USER_CACHE_SIZE, ttl=USER_CACHE_TTL
+    )
+    # user_id -> ids of owned collections
+    collection_ids_cache: SharedCache[int, frozenset[UUID]] = SharedCache(
+        "collection_ids", max_size=USER_CACHE_SIZE, ttl=USER_CACHE_TTL
+    )
 
-    @staticmethod
+    @classmethod
     @logfire.instrument(record_return=True)
     async def create(
-        session: AsyncSession, owner_id: int, collection_create: CollectionCreate
+        cls, session: AsyncSession, owner_id: int, collection_create: CollectionCreate
     ) -> Collection:
         new_collection = Collection.model_validate(collection_create, update={"owner_id": owner_id})
 
@@ -39,8 +56,23 @@ class CollectionService:
         await session.flush()
         await session.refresh(new_collection)
 
+        await cls.collection_ids_cache.invalidate(session, [owner_id])
+
         return new_collection
 
+    @classmethod
+    @logfire.instrument(record_return=True)
+    async def get_ids_by_owner(cls, session: AsyncSession, owner_id: int) -> frozenset[UUID]:
+        if (cached := cls.collection_ids_cache.get(owner_id)) is not None:
+            return cached
+
+        statement = select(Collection.id).where(Collection.owner_id == owner_id)
+
+        collection_ids = frozenset((await session.exec(statement)).all())
+
+        cls.collection_ids_cache.set_loaded(session, owner_id, collection_ids)
+        return collection_ids
+
     @classmethod
     @logfire.instrument(record_return=True)
     async def get_by_id(
@@ -121,9 +153,10 @@ class CollectionService:
 
         return collection
 
-    @staticmethod
+    @classmethod
     @logfire.instrument(record_return=True)
     async def delete_bulk(
+        cls,
         session: AsyncSession,
         user: AuthenticatedUserWithCollectionIds,
         collection_ids: list[UUID],
@@ -135,6 +168,10 @@ class CollectionService:
 
         await session.exec(statement)
 
+        await cls.collection_ids_cache.invalidate(session, [user.id])
+        # default collection might have been deleted
+        await cls.default_collection_cache.invalidate(session, [user.id])
+
     @classmethod
     @logfire.instrument(record_return=True)
     async def add_products(
@@ -201,11 +238,10 @@ class CollectionService:
         if not user.collection_ids:
             return []
 
-        statement = select(CollectionProductLink.collection_id).where(
-            CollectionProductLink.product_id == product_id,
-            CollectionProductLink.collection_id.in_(user.collection_ids),
+        records = await fetch(
+            session, _PRODUCT_INCLUSION_QUERY, product_id, list(user.collection_ids)
         )
-        return (await session.exec(statement)).all()
+        return [record["collection_id"] for record in records]
 
     @classmethod
     @logfire.instrument(record_return=True)
@@ -246,7 +282,10 @@ class CollectionService:
     @classmethod
     @logfire.instrument(record_return=True)
     async def fill_product_inclusion(
-        cls, session: AsyncSession, products: list[Product], user_id: int
+        cls,
+        session: AsyncSession,
+        products: list[Product] | list[BriefProductSchema],
+        user_id: int,
     ) -> None:
         """
         Fill `is_contained_in_user_collections` flag for each product in the list.
@@ -260,11 +299,10 @@ class CollectionService:
             session=session, user_id=user_id
         )
 
-        statement = select(CollectionProductLink.product_id).where(
-            CollectionProductLink.collection_id == default_collection_id,
-            CollectionProductLink.product_id.in_([p.id for p in products]),
+        records = await fetch(
+            session, _PRODUCTS_IN_COLLECTION_QUERY, default_collection_id, [p.id for p in products]
         )
-        product_ids_in_collection = set((await session.exec(statement)).all())
+        product_ids_in_collection = {record["product_id"] for record in records}
 
         for product in products:
             product.is_contained_in_user_collections = product.id in product_ids_in_collection
@@ -272,8 +310,8 @@ class CollectionService:
     @classmethod
     @logfire.instrument(record_return=True)
     async def _get_default_collection_id(cls, session: AsyncSession, user_id: int) -> UUID:
-        if user_id in cls._default_collection_cache:
-            return cls._default_collection_cache[user_id]
+        if (cached := cls.default_collection_cache.get(user_id)) is not None:
+            return cached
 
         statement = (
             select(Collection.id)
@@ -286,8 +324,5 @@ class CollectionService:
         if result is None:
             raise CollectionNotFoundError
 
-        if len(cls._default_collection_cache) >= cls._DEFAULT_CACHE_MAX_SIZE:
-            cls._default_collection_cache.pop(next(iter(cls._default_collection_cache)))
-
-        cls._default_collection_cache[user_id] = result
+        cls.default_collection_cache.set_loaded(session, user_id, result)
         return result
@@ -1,12 +1,17 @@
 from uuid import UUID
 
 import logfire
+from sqlalchemy import exists, true
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import aliased
+from sqlmodel import delete, func, select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.core.exceptions import ProductNotFoundError
-from app.model import Interaction, InteractionType
+from app.model import Collection, CollectionProductLink, Interaction, InteractionType
+
+from .search import SearchService
 
 
 # noinspection PyTypeChecker
@@ -19,7 +24,14 @@ class InteractionService:
         product_id: UUID,
         interaction_type: InteractionType,
     ) -> None:
-        statement = (
+        """
+        Record interaction and sync user's default collection in a single statement.
+
+        - like adds the product to the default collection
+        - dislike removes the product from the default collection,
+          unless the user has also put it into another collection
+        """
+        interaction = (
             insert(Interaction)
             .values(
                 user_id=user_id,
@@ -28,10 +40,62 @@ class InteractionService:
             )
             .on_conflict_do_update(
                 index_elements=["user_id", "product_id"],
-                set_={"interaction_type": interaction_type},
+                set_={"interaction_type": interaction_type, "updated_at": func.now()},
             )
+            .returning(Interaction.product_id)
+            .cte("recorded_interaction")
         )
 
+        default_collection_id = (
+            select(Collection.id)
+            .where(Collection.owner_id == user_id)
+            .order_by(Collection.created_at.asc())
+            .limit(1)
+        )
+
+        if interaction_type == InteractionType.LIKE:
+            collection_sync = (
+                insert(CollectionProductLink)
+                .from_select(
+                    ["collection_id", "product_id"],
+                    default_collection_id.add_columns(interaction.c.product_id).join(
+                        interaction, true()
+                    ),
+                )
+                .on_conflict_do_nothing(
+                    index_elements=[
+                        CollectionProductLink.collection_id,
+                        CollectionProductLink.product_id,
+                    ]
+                )
+                .cte("added_link")
+            )
+        else:  # InteractionType.DISLIKE
+            other_link = aliased(CollectionProductLink)
+            other_collection = aliased(Collection)
+
+            collection_sync = (
+                delete(CollectionProductLink)
+                .where(
+                    CollectionProductLink.collection_id == default_collection_id.scalar_subquery(),
+                    CollectionProductLink.product_id == product_id,
+                    ~exists().where(
+                        other_link.collection_id == other_collection.id,
+                        other_link.product_id == product_id,
+                        other_link.collection_id != CollectionProductLink.collection_id,
+                        other_collection.owner_id == user_id,
+                    ),
+                )
+                .cte("removed_link")
+            )
+
+        # data-modifying CTEs run regardless of being referenced, notification is sent on commit
+        statement = select(
+            SearchService.build_product_interaction_notification(
+                user_id=user_id, product_id=product_id, interaction_type=interaction_type
+            )
+        ).add_cte(interaction, collection_sync)
+
         try:
             await session.exec(statement)
         except IntegrityError as e:
@@ -8,11 +8,25 @@ from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.core.exceptions import ProductNotFoundError
-from app.model import Product
+from app.database import fetch
+from app.model import BRIEF_PRODUCT_FIELDS, BriefProductSchema, Product
+from app.util import SingleFlight
+
+# unnest keeps the requested (e.g. relevance) order and binds all IDs as a single parameter
+_MANY_BY_IDS_QUERY = f"""
+    SELECT {", ".join(f"product.{field}" for field in BRIEF_PRODUCT_FIELDS)}
+    FROM unnest($1::uuid[]) WITH ORDINALITY AS requested_ids (id, position)
+    JOIN {Product.__tablename__} AS product USING (id)
+    ORDER BY requested_ids.position
+"""  # noqa: S608
 
 
 # noinspection PyTypeChecker,Pydantic
 class ProductService:
+    _many_by_ids_flight: SingleFlight[tuple[UUID, ...], list[BriefProductSchema]] = SingleFlight(
+        "products_by_ids"
+    )
+
     @staticmethod
     @logfire.instrument(record_return=True)
     async def get_by_id(session: AsyncSession, product_id: UUID) -> Product:
@@ -27,15 +41,32 @@ class ProductService:
         except InvalidRequestError as e:
             raise ProductNotFoundError from e
 
-    # noinspection PyUnresolvedReferences
-    @staticmethod
+    @classmethod
     @logfire.instrument(record_return=True)
-    async def get_many_by_ids(session: AsyncSession, product_ids: Sequence[UUID]) -> list[Product]:
+    async def get_many_by_ids(
+        cls, session: AsyncSession, product_ids: Sequence[UUID]
+    ) -> list[BriefProductSchema]:
+        """
+        Get brief products in the requested order, skipping missing ones.
+
+        Identical concurrent requests share a single query, each caller gets its own copies.
+        """
         if not product_ids:
             return []
 
-        statement = (  # assuming brief load
-            select(Product).where(Product.id.in_(product_ids))
+        products = await cls._many_by_ids_flight.run(
+            tuple(product_ids),
+            lambda: cls._load_many_by_ids(session=session, product_ids=product_ids),
         )
 
-        return (await session.exec(statement)).all()
+        return [product.model_copy() for product in products]
+
+    @staticmethod
+    async def _load_many_by_ids(
+        session: AsyncSession, product_ids: Sequence[UUID]
+    ) -> list[BriefProductSchema]:
+        # rows come straight from the product table, so validation is skipped
+        return [
+            BriefProductSchema.model_construct(**record, is_contained_in_user_collections=False)
+            for record in await fetch(session, _MANY_BY_IDS_QUERY, list(product_ids))
+        ]
@@ -1,161 +1,1093 @@
-from collections.abc import Sequence
+import asyncio
+import json
+from collections import Counter
+from collections.abc import AsyncGenerator, Collection, Sequence
+from contextlib import suppress
 from datetime import datetime
+from typing import Any
 from uuid import UUID
 
 import logfire
 import pg_async_events
-from elasticsearch.dsl import AsyncSearch
+from elasticsearch import BadRequestError as ElasticBadRequestError
+from elasticsearch import NotFoundError as ElasticNotFoundError
+from elasticsearch.dsl import AsyncMultiSearch, AsyncSearch, async_connections
 from elasticsearch.dsl.function import RandomScore
 from elasticsearch.dsl.query import (
     Bool,
     FunctionScore,
-    Match,
+    Ids,
     MatchAll,
     MultiMatch,
     Range,
+    Term,
     Terms,
 )
-from sqlmodel import select
+from elasticsearch.dsl.response import Response
+from sqlalchemy import Function, distinct, true
+from sqlalchemy.dialects.postgresql import JSONB, aggregate_order_by
+from sqlmodel import func, select
 from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlmodel.sql.expression import SelectOfScalar
 
-from app.database import start_readonly_session
-from app.model import Product, SearchMeta
-from app.util import AsyncRWLock
+from app.core.config import (
+    SEARCH_CACHE_SIZE,
+    SEARCH_CACHE_TTL,
+    SEARCH_INDEXER_DEBOUNCE,
+    SEARCH_PROFILE_TTL,
+    SEARCH_SYNC_BATCH_SIZE,
+    SEARCH_SYNC_CONCURRENCY,
+)
+from app.core.exceptions import SearchCursorInvalidError, SearchReindexInProgressError
+from app.database import (
+    LeadershipLostError,
+    acquire_leadership,
+    start_primary_readonly_session,
+)
+from app.model import (
+    PRODUCT_CHANGE_NOTIFICATION_CHANNEL,
+    BriefProductSchema,
+    Interaction,
+    InteractionType,
+    Product,
+    SearchFacetBucket,
+    SearchFacets,
+    SearchMeta,
+    SearchPriceBucket,
+    SearchQuery,
+    SearchResult,
+    SearchSyncReport,
+)
+from app.util import SingleFlight, TTLCache
 
-from .config import PRODUCT_INDEX_NAME
+from ..product import ProductService
+from .bulk import BulkAction, build_delete_action, bulk_index
+from .config import (
+    PRODUCT_INDEX_ALIAS,
+    SEARCH_CURSOR_KEEP_ALIVE,
+    SEARCH_FACET_SIZE,
+    SEARCH_PRICE_HISTOGRAM_INTERVAL,
+    SEARCH_PROFILE_MAX_DISLIKED,
+)
+from .cursor import SearchCursor
 from .indexes import Product as ProductDocument
-from .util import get_current_hour_seed, is_article
+from .meta import SearchMetaSnapshot
+from .profile import SearchProfile
+from .suggestions import SuggestionIndex
+from .util import (
+    get_current_hour_seed,
+    is_article,
+    normalize_search_query,
+    normalize_suggestion_query,
+    raise_on_elastic_unavailability,
+)
+from .versioning import create_versioned_index, finalize_versioned_index, switch_alias
 
 META_REFRESH_NOTIFICATION_CHANNEL = "search_meta_refresh"
+META_NOTIFICATION_CHANNEL = "search_meta"
+PRODUCTS_INDEXED_NOTIFICATION_CHANNEL = "search_products_indexed"
+PRODUCT_INTERACTION_NOTIFICATION_CHANNEL = "search_product_interaction"
+PRODUCT_INDEXER_LEADERSHIP_NAME = "product_indexer"
+META_LEADERSHIP_NAME = "search_meta"
+REINDEX_LOCK_NAME = "search_reindex"
+
+MAX_NOTIFICATION_PAYLOAD_SIZE = 8000  # bytes, postgres limit
+PRODUCT_IDS_PER_NOTIFICATION = MAX_NOTIFICATION_PAYLOAD_SIZE // 50  # serialized UUID takes 40
+
+type ProductLookupEntry = tuple[str, tuple[str, ...], int]  # article, suggestions, weight
+
+_FACET_FIELDS = {  # facet name -> indexed field
+    "brands": "brand",
+    "categories": "category",
+    "colors": "color_name",
+    "sizes": "sizes",
+}
 
 
 class SearchService:
-    _meta_cache: SearchMeta
-    _meta_cache_lock = AsyncRWLock()
+    _meta_snapshot = SearchMetaSnapshot.build(
+        SearchMeta(brands=[], categories=[], colors={}, sizes=[]), version=0
+    )
 
-    @staticmethod
+    # product ID -> what the product contributes to the lookups below, allows partial updates
+    _product_lookup_entries: dict[UUID, ProductLookupEntry] = {}  # noqa: RUF012
+    # unique article -> product ID, lets article queries skip full-text search
+    _article_product_ids: dict[str, UUID] = {}  # noqa: RUF012
+
+    # offset pagination and fuzzy suggestion results, cleared whenever indexed products change
+    _search_cache: TTLCache[tuple, Response] = TTLCache(
+        "search", max_size=SEARCH_CACHE_SIZE, ttl=SEARCH_CACHE_TTL
+    )
+    # identical searches in flight share a single Elasticsearch request (responses are read-only)
+    _search_flight: SingleFlight[str, Response] = SingleFlight("search")
+    _multi_search_flight: SingleFlight[str, list[Response]] = SingleFlight("multi_search")
+
+    _suggestion_weights: Counter[str] = Counter()  # noqa: RUF012
+    _suggestion_index = SuggestionIndex({})  # replaced as a whole on every update
+    _suggestion_cache: TTLCache[tuple, list[str]] = TTLCache(
+        "suggestions", max_size=SEARCH_CACHE_SIZE, ttl=SEARCH_CACHE_TTL
+    )
+    _profile_cache: TTLCache[int, SearchProfile] = TTLCache(
+        "search_profiles", max_size=SEARCH_CACHE_SIZE, ttl=SEARCH_PROFILE_TTL
+    )
+
+    @classmethod
     @logfire.instrument(record_return=True)
     async def search_products(
-        user_id: int,  # noqa: ARG004
-        query: str | None,
-        categories: list[str] | None,
-        colors: list[str] | None,
-        brands: list[str] | None,
-        sizes: list[str] | None,
-        min_price: float | None,
-        max_price: float | None,
+        cls,
+        user_id: int,
+        search_query: SearchQuery,
+        limit: int,
+        offset: int,
+        cursor: str | None = None,
+        *,
+        facets: bool = False,
+    ) -> SearchResult[UUID]:
+        """
+        Search products, returning their IDs in relevance order.
+
+        :param cursor: switches to cursor pagination (`offset` is ignored),
+            an empty string starts a new cursor session
+        :param facets: also count filter values of all matching products in the same request
+        """
+        search_query = normalize_search_query(search_query)
+
+        if not facets:
+            article_page = cls._get_article_page(search_query, 0 if cursor is not None else offset)
+            if article_page is not None:  # a single page, no cursor
+                return SearchResult(items=article_page, next_cursor=None, facets=None)
+
+        response, next_cursor = await cls._search_product_response(
+            search_query=search_query,
+            profile=await cls._get_search_profile(user_id),
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
+            source=False,
+            facets=facets,
+        )
+
+        return SearchResult(
+            items=[UUID(hit.meta.id) for hit in response.hits],
+            next_cursor=next_cursor,
+            facets=cls._build_facets(response) if facets else None,
+        )
+
+    @classmethod
+    @logfire.instrument(record_return=True)
+    async def search_product_cards(
+        cls,
+        session: AsyncSession,
+        user_id: int,
+        search_query: SearchQuery,
+        limit: int,
+        offset: int,
+        cursor: str | None = None,
+        *,
+        facets: bool = False,
+    ) -> SearchResult[BriefProductSchema]:
+        """
+        Search products, returning brief products built from the stored product cards.
+
+        Products indexed before cards were introduced are loaded from the database.
+        """
+        response, next_cursor = await cls._search_product_response(
+            search_query=search_query,
+            profile=await cls._get_search_profile(user_id),
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
+            source=["card"],
+            facets=facets,
+        )
+        hits = response.hits
+
+        products: dict[UUID, BriefProductSchema] = {
+            UUID(hit.meta.id): BriefProductSchema.model_validate(
+                hit.card.to_dict(), update={"is_contained_in_user_collections": False}
+            )
+            for hit in hits
+            if "card" in hit
+        }
+
+        missing_product_ids = [UUID(hit.meta.id) for hit in hits if "card" not in hit]
+        if missing_product_ids:
+            for product in await ProductService.get_many_by_ids(
+                session=session, product_ids=missing_product_ids
+            ):
+                products[product.id] = product
+
+        return SearchResult(
+            items=[
+                products[product_id]
+                for product_id in (UUID(hit.meta.id) for hit in hits)
+                if product_id in products
+            ],
+            next_cursor=next_cursor,
+            facets=cls._build_facets(response) if facets else None,
+        )
+
+    @classmethod
+    @logfire.instrument(record_return=True)
+    async def search_products_batch(
+        cls,
+        user_id: int,
+        search_queries: Sequence[SearchQuery],
+        limit: int,
+        offset: int,
+    ) -> list[list[UUID]]:
+        """
+        Run several searches at once, returning product IDs for each query in relevance order.
+
+        All searches missing from the cache are sent in a single `_msearch` request.
+        """
+        seed = get_current_hour_seed()
+        profile = await cls._get_search_profile(user_id)
+        search_queries = [normalize_search_query(search_query) for search_query in search_queries]
+
+        results: list[list[UUID] | None] = [
+            cls._get_article_page(search_query, offset) for search_query in search_queries
+        ]
+        cache_keys = [
+            cls._build_search_cache_key(
+                search_query, profile, limit, offset, seed, source=False, facets=False
+            )
+            for search_query in search_queries
+        ]
+        responses: list[Response | None] = [
+            cls._search_cache.get(key) if result is None else None
+            for key, result in zip(cache_keys, results, strict=True)
+        ]
+
+        multi_search = AsyncMultiSearch(index=PRODUCT_INDEX_ALIAS)
+        pending_positions = [
+            position
+            for position, (result, response) in enumerate(zip(results, responses, strict=True))
+            if result is None and response is None
+        ]
+
+        for position in pending_positions:
+            multi_search = multi_search.add(
+                cls._build_offset_search(
+                    search_queries[position],
+                    profile,
+                    limit,
+                    offset,
+                    seed,
+                    source=False,
+                    facets=False,
+                )
+            )
+
+        if pending_positions:
+            for position, response in zip(
+                pending_positions, await cls._execute_multi_shared(multi_search), strict=True
+            ):
+                responses[position] = response
+                cls._search_cache.set(cache_keys[position], response)
+
+        return [
+            result if result is not None else [UUID(hit.meta.id) for hit in response.hits]
+            for result, response in zip(results, responses, strict=True)
+        ]
+
+    @classmethod
+    @logfire.instrument(record_return=True)
+    async def get_suggestions(cls, query: str | None, limit: int) -> list[str]:
+        """
+        Suggest product names, brands and categories by prefix of any word, most popular first.
+
+        Suggestions are served from memory, fuzzy matches are added from Elasticsearch
+        only if there are not enough exact prefix matches.
+        """
+        query = normalize_suggestion_query(query)
+
+        suggestions = cls._suggestion_index.suggest(query, limit)
+
+        if query and len(suggestions) < limit:
+            for suggestion in await cls._get_fuzzy_suggestions(query, limit):
+                if suggestion not in suggestions and len(suggestions) < limit:
+                    suggestions.append(suggestion)
+
+        return suggestions
+
+    @classmethod
+    async def _get_fuzzy_suggestions(cls, query: str, limit: int) -> list[str]:
+        cache_key = (query, limit)
+        if (cached := cls._suggestion_cache.get(cache_key)) is not None:
+            return cached
+
+        search = (
+            AsyncSearch(index=PRODUCT_INDEX_ALIAS)
+            .source(fields=False)
+            .suggest(
+                "fuzzy",
+                query,
+                completion={
+                    "field": "suggest",
+                    "size": limit,
+                    "skip_duplicates": True,
+                    "fuzzy": {"fuzziness": "AUTO"},
+                },
+            )
+        )[0:0]
+
+        response = await cls._execute_shared(search)
+
+        suggestions = [option.text for option in response.suggest.fuzzy[0].options]
+        cls._suggestion_cache.set(cache_key, suggestions)
+
+        return suggestions
+
+    @classmethod
+    async def _search_product_response(
+        cls,
+        search_query: SearchQuery,
+        profile: SearchProfile,
+        limit: int,
+        offset: int,
+        cursor: str | None,
+        *,
+        source: bool | list[str],
+        facets: bool,
+    ) -> tuple[Response, str | None]:
+        """:return: search response and the next page cursor (only in cursor pagination mode)"""
+        search_query = normalize_search_query(search_query)
+
+        if cursor is None:
+            seed = get_current_hour_seed()
+
+            cache_key = cls._build_search_cache_key(
+                search_query, profile, limit, offset, seed, source=source, facets=facets
+            )
+            if (cached := cls._search_cache.get(cache_key)) is not None:
+                return cached, None
+
+            response = await cls._search_article_response(
+                search_query, limit, offset, source=source, facets=facets
+            )
+            if response is None:
+                search = cls._build_offset_search(
+                    search_query, profile, limit, offset, seed, source=source, facets=facets
+                )
+                response = await cls._execute_shared(search)
+
+            cls._search_cache.set(cache_key, response)
+
+            return response, None
+
+        response = await cls._search_article_response(
+            search_query, limit, 0, source=source, facets=facets
+        )
+        if response is not None:  # a single page, no cursor
+            return response, None
+
+        return await cls._search_product_response_after(
+            search_query=search_query,
+            profile=profile,
+            limit=limit,
+            cursor=SearchCursor.decode(cursor) if cursor else None,
+            source=source,
+            facets=facets,
+        )
+
+    @classmethod
+    async def _search_product_response_after(
+        cls,
+        search_query: SearchQuery,
+        profile: SearchProfile,
+        limit: int,
+        cursor: SearchCursor | None,
+        *,
+        source: bool | list[str],
+        facets: bool,
+    ) -> tuple[Response, str | None]:
+        """
+        Fetch the page following the cursor using point-in-time and `search_after`.
+
+        Every page costs the same regardless of depth, and the order (including the random
+        seed of the default feed) stays fixed for the whole cursor session.
+        """
+        client = async_connections.get_connection()
+
+        if cursor is None:
+            with raise_on_elastic_unavailability():
+                point_in_time = await client.open_point_in_time(
+                    index=PRODUCT_INDEX_ALIAS, keep_alive=SEARCH_CURSOR_KEEP_ALIVE
+                )
+            cursor = SearchCursor(
+                pit_id=point_in_time["id"], search_after=[], seed=get_current_hour_seed()
+            )
+
+        search = (
+            cls._build_product_search(search_query, seed=cursor.seed, profile=profile)
+            .index()  # the index is defined by point-in-time
+            .source(fields=source)
+            .sort("_score", "_shard_doc")
+            .extra(
+                pit={"id": cursor.pit_id, "keep_alive": SEARCH_CURSOR_KEEP_ALIVE},
+                track_total_hits=False,
+            )
+        )[0:limit]
+
+        if cursor.search_after:
+            search = search.extra(search_after=cursor.search_after)
+
+        if facets:
+            cls._add_facet_aggregations(search)
+
+        try:
+            with raise_on_elastic_unavailability():
+                response = await search.execute()
+        except (ElasticBadRequestError, ElasticNotFoundError) as e:  # malformed or expired
+            raise SearchCursorInvalidError from e
+
+        if len(response.hits) < limit:
+            with suppress(ElasticNotFoundError):
+                await client.close_point_in_time(id=response.pit_id)
+
+            return response, None
+
+        next_cursor = SearchCursor(
+            pit_id=response.pit_id,
+            search_after=list(response.hits[-1].meta.sort),
+            seed=cursor.seed,
+        )
+
+        return response, next_cursor.encode()
+
+    @classmethod
+    async def _execute_shared(cls, search: AsyncSearch) -> Response:
+        """Execute search, sharing the response of an identical search already in flight."""
+        key = json.dumps(search.to_dict(), sort_keys=True, default=str)
+
+        with raise_on_elastic_unavailability():
+            return await cls._search_flight.run(key, search.execute)
+
+    @classmethod
+    async def _execute_multi_shared(cls, multi_search: AsyncMultiSearch) -> list[Response]:
+        key = json.dumps(multi_search.to_dict(), sort_keys=True, default=str)
+
+        with raise_on_elastic_unavailability():
+            return await cls._multi_search_flight.run(key, multi_search.execute)
+
+    @classmethod
+    def _build_offset_search(
+        cls,
+        search_query: SearchQuery,
+        profile: SearchProfile,
         limit: int,
         offset: int,
-    ) -> list[UUID]:
-        search = AsyncSearch(index=PRODUCT_INDEX_NAME).source(fields=False)
-
-        if query:
-            if is_article(query):
-                # noinspection PyTypeChecker
-                article_search = search.query(Match("article", query))
-                article_response = await article_search.execute()
-
-                if len(article_response.hits) == 1:
-                    return [UUID(hit.meta.id) for hit in article_response.hits]
-
-            search = search.query(
-                MultiMatch(
-                    query=query,
-                    fields=["name^3", "category^3", "color_name^2", "brand^2", "description^1"],
-                    fuzziness="AUTO",
+        seed: int,
+        *,
+        source: bool | list[str],
+        facets: bool,
+    ) -> AsyncSearch:
+        search = cls._build_product_search(search_query, seed=seed, profile=profile)
+        search = search.source(fields=source)[offset : offset + limit]
+
+        if facets:
+            cls._add_facet_aggregations(search)
+
+        return search
+
+    @classmethod
+    def _get_article_page(cls, search_query: SearchQuery, offset: int) -> list[UUID] | None:
+        """:return: page of the product with the queried article, if there is one in the lookup"""
+        product_id = cls._get_article_product_id(search_query)
+        if product_id is None:
+            return None
+
+        return [product_id] if offset == 0 else []
+
+    @classmethod
+    async def _search_article_response(
+        cls,
+        search_query: SearchQuery,
+        limit: int,
+        offset: int,
+        *,
+        source: bool | list[str],
+        facets: bool,
+    ) -> Response | None:
+        """
+        Fetch the product with the queried article, when the response needs its document.
+
+        :return: `None` if the query is not an article in the lookup, or the lookup is stale
+        """
+        product_id = cls._get_article_product_id(search_query)
+        if product_id is None:
+            return None
+
+        # article is checked too, the product might have changed since the lookup update
+        search = (
+            AsyncSearch(index=PRODUCT_INDEX_ALIAS)
+            .filter(Ids(values=[str(product_id)]))
+            .filter(Term("article", search_query.query))
+            .source(fields=source)
+        )[offset : offset + limit]
+
+        if facets:
+            cls._add_facet_aggregations(search)
+
+        response = await cls._execute_shared(search)
+
+        if response.hits.total.value == 0:
+            return None
+
+        return response
+
+    @classmethod
+    def _get_article_product_id(cls, search_query: SearchQuery) -> UUID | None:
+        if not search_query.query or not is_article(search_query.query):
+            return None
+
+        return cls._article_product_ids.get(search_query.query)
+
+    @classmethod
+    async def _get_search_profile(cls, user_id: int) -> SearchProfile:
+        if (cached := cls._profile_cache.get(user_id)) is not None:
+            return cached
+
+        async with start_primary_readonly_session() as session:
+            profile = await cls._compute_search_profile(session=session, user_id=user_id)
+
+        cls._profile_cache.set(user_id, profile)
+
+        return profile
+
+    # noinspection PyTypeChecker,Pydantic
+    @staticmethod
+    @logfire.instrument(record_return=True)
+    async def _compute_search_profile(session: AsyncSession, user_id: int) -> SearchProfile:
+        statement = (
+            select(
+                Product.brand,
+                Product.category,
+                Product.color_name,
+                Interaction.interaction_type,
+                func.count(),
+            )
+            .join(Product, Product.id == Interaction.product_id)
+            .where(Interaction.user_id == user_id)
+            .group_by(
+                Product.brand,
+                Product.category,
+                Product.color_name,
+                Interaction.interaction_type,
+            )
+        )
+
+        counts = (await session.exec(statement)).all()
+
+        disliked_statement = (
+            select(Interaction.product_id)
+            .where(
+                Interaction.user_id == user_id,
+                Interaction.interaction_type == InteractionType.DISLIKE,
+            )
+            .order_by(Interaction.updated_at.desc())  # most recent dislikes are kept
+            .limit(SEARCH_PROFILE_MAX_DISLIKED)
+        )
+        disliked_product_ids = (await session.exec(disliked_statement)).all()
+
+        return SearchProfile.from_interactions(counts, disliked_product_ids=disliked_product_ids)
+
+    @staticmethod
+    def build_product_interaction_notification(
+        user_id: int, product_id: UUID, interaction_type: InteractionType
+    ) -> Function:
+        """
+        Build notification letting every worker update the cached user profile.
+
+        Meant to be selected within the transaction recording the interaction,
+        so it is delivered once the transaction is committed.
+        """
+        payload = {
+            "user_id": user_id,
+            "product_id": str(product_id),
+            "interaction_type": interaction_type,
+        }
+
+        return func.pg_notify(PRODUCT_INTERACTION_NOTIFICATION_CHANNEL, json.dumps(payload))
+
+    @classmethod
+    async def product_interaction_listener(cls) -> None:
+        async for notification in pg_async_events.subscribe(
+            PRODUCT_INTERACTION_NOTIFICATION_CHANNEL
+        ):
+            try:
+                cls.handle_product_interaction_notification(
+                    user_id=notification["user_id"],
+                    product_id=UUID(notification["product_id"]),
+                    interaction_type=InteractionType(notification["interaction_type"]),
                 )
+            except Exception:
+                logfire.exception("Failed to apply product interaction to search profile")
+
+    @classmethod
+    @logfire.instrument
+    def handle_product_interaction_notification(
+        cls, user_id: int, product_id: UUID, interaction_type: InteractionType
+    ) -> None:
+        profile = cls._profile_cache.peek(user_id)
+
+        if profile is None:  # it will be loaded from scratch anyway
+            return
+
+        profile.apply_interaction(product_id, interaction_type)
+
+        if profile.is_over_disliked_limit:
+            cls._profile_cache.pop(user_id)
+
+    @staticmethod
+    def _build_search_cache_key(
+        search_query: SearchQuery,
+        profile: SearchProfile,
+        limit: int,
+        offset: int,
+        seed: int,
+        *,
+        source: bool | list[str],
+        facets: bool,
+    ) -> tuple:
+        # users without interactions share the same profile and therefore the cache entries
+        return (
+            search_query.model_dump_json(),
+            profile.build_cache_key(),
+            limit,
+            offset,
+            seed,
+            str(source),
+            facets,
+        )
+
+    @staticmethod
+    def _build_product_search(
+        search_query: SearchQuery, seed: int, profile: SearchProfile
+    ) -> AsyncSearch:
+        if search_query.query:
+            query = MultiMatch(
+                query=search_query.query,
+                fields=["name^3", "category^3", "color_name^2", "brand^2", "description^1"],
+                fuzziness="AUTO",
             )
+        else:
+            query = MatchAll()
 
         filters = []
 
-        if categories:
-            filters.append(Terms("category", categories))
+        if search_query.categories:
+            filters.append(Terms("category", search_query.categories))
 
-        if colors:
-            filters.append(Terms("color_name", colors))
+        if search_query.colors:
+            filters.append(Terms("color_name", search_query.colors))
 
-        if brands:
-            filters.append(Terms("brand", brands))
+        if search_query.brands:
+            filters.append(Terms("brand", search_query.brands))
 
-        if sizes:
-            filters.append(Terms("sizes", sizes))
+        if search_query.sizes:
+            filters.append(Terms("sizes", search_query.sizes))
 
-        if min_price is not None or max_price is not None:
+        if search_query.min_price is not None or search_query.max_price is not None:
             price_range = {}
 
-            if min_price is not None:
-                price_range["gte"] = min_price
-            if max_price is not None:
-                price_range["lte"] = max_price
+            if search_query.min_price is not None:
+                price_range["gte"] = search_query.min_price
+            if search_query.max_price is not None:
+                price_range["lte"] = search_query.max_price
 
             filters.append(Range("price", price_range))
 
+        score_functions = profile.build_score_functions()
+
+        if not search_query.query and not filters:
+            score_functions.append(RandomScore(seed=seed, field="_seq_no"))
+
+        if score_functions:
+            query = FunctionScore(query=query, functions=score_functions, score_mode="multiply")
+
+        search = AsyncSearch(index=PRODUCT_INDEX_ALIAS).query(query)
+
         if filters:
             search = search.filter(Bool(filter=filters))
 
-        if not query and not filters:
-            search = search.query(
-                FunctionScore(
-                    query=MatchAll(),
-                    functions=[RandomScore(seed=get_current_hour_seed(), field="_seq_no")],
-                )
+        if (exclusion := profile.build_exclusion()) is not None:
+            search = search.exclude(exclusion)
+
+        return search
+
+    @staticmethod
+    def _add_facet_aggregations(search: AsyncSearch) -> None:
+        """Add facet aggregations to the search in place, they see exactly the matching products."""
+        for name, field in _FACET_FIELDS.items():
+            search.aggs.bucket(name, "terms", field=field, size=SEARCH_FACET_SIZE)
+
+        search.aggs.bucket(
+            "price_histogram",
+            "histogram",
+            field="price",
+            interval=SEARCH_PRICE_HISTOGRAM_INTERVAL,
+            min_doc_count=1,
+        )
+        search.aggs.metric("price_stats", "stats", field="price")
+
+    @staticmethod
+    def _build_facets(response: Response) -> SearchFacets:
+        aggregations = response.aggregations
+
+        return SearchFacets(
+            **{
+                name: [
+                    SearchFacetBucket(value=bucket.key, count=bucket.doc_count)
+                    for bucket in aggregations[name].buckets
+                ]
+                for name in _FACET_FIELDS
+            },
+            price_histogram=[
+                SearchPriceBucket(min_price=bucket.key, count=bucket.doc_count)
+                for bucket in aggregations.price_histogram.buckets
+            ],
+            min_price=aggregations.price_stats.min,
+            max_price=aggregations.price_stats.max,
+        )
+
+    # noinspection PyTypeChecker,Pydantic
+    @classmethod
+    @logfire.instrument(record_return=True)
+    async def sync_products(
+        cls,
+        session: AsyncSession,
+        since: datetime,
+        batch_size: int = SEARCH_SYNC_BATCH_SIZE,
+        concurrency: int = SEARCH_SYNC_CONCURRENCY,
+    ) -> SearchSyncReport:
+        """
+        Sync product index with database.
+
+        Products are streamed from a server-side cursor in chunks of `batch_size`,
+        each chunk is sent to Elasticsearch as a single `_bulk` request.
+        """
+        report = await cls._sync_statement(
+            session=session,
+            statement=select(Product).where(Product.updated_at >= since),
+            batch_size=batch_size,
+            concurrency=concurrency,
+        )
+
+        await cls.notify_products_indexed()
+
+        return report
+
+    # noinspection PyTypeChecker,Pydantic
+    @classmethod
+    @logfire.instrument(record_return=True)
+    async def reindex_products(
+        cls,
+        session: AsyncSession,
+        batch_size: int = SEARCH_SYNC_BATCH_SIZE,
+        concurrency: int = SEARCH_SYNC_CONCURRENCY,
+    ) -> SearchSyncReport:
+        """
+        Rebuild product index from scratch without interrupting search.
+
+        All products are loaded into a new index version, which then atomically replaces
+        the current one behind the alias.
+        Only one reindex runs at a time, as switching the alias deletes all other versions.
+        """
+        # held until the caller's transaction ends
+        lock_acquired = (
+            await session.exec(
+                select(func.pg_try_advisory_xact_lock(func.hashtext(REINDEX_LOCK_NAME)))
             )
+        ).one()
+        if not lock_acquired:
+            raise SearchReindexInProgressError
 
-        search = search[offset : offset + limit]
+        started_at = (await session.exec(select(func.now()))).one()
 
-        response = await search.execute()
+        index_name = await create_versioned_index()
 
-        return [UUID(hit.meta.id) for hit in response.hits]
+        report = await cls._sync_statement(
+            session=session,
+            statement=select(Product),
+            batch_size=batch_size,
+            concurrency=concurrency,
+            index=index_name,
+        )
+
+        await finalize_versioned_index(index_name)
+        await switch_alias(index_name)
+
+        # changes made during the rebuild were only synced to the previous version,
+        # changes made from now on reach the new one through the alias
+        await cls._sync_statement(
+            session=session,
+            statement=select(Product).where(Product.updated_at >= started_at),
+            batch_size=batch_size,
+            concurrency=concurrency,
+            index=index_name,
+        )
+        await cls._prune_deleted_products(
+            session=session, index=index_name, batch_size=batch_size, concurrency=concurrency
+        )
+
+        await cls.notify_products_indexed()
+
+        return report
 
     @staticmethod
     @logfire.instrument(record_return=True)
-    async def get_suggestions(query: str | None, limit: int) -> list[str]:
-        search = AsyncSearch(index=PRODUCT_INDEX_NAME).source(fields=["name_suggest"])
-
-        if query:
-            search = search.query(
-                MultiMatch(
-                    query=query,
-                    fields=["name_suggest", "name_suggest._2gram", "name_suggest._3gram"],
-                    type="bool_prefix",
-                )
+    async def _sync_statement(
+        session: AsyncSession,
+        statement: SelectOfScalar[Product],
+        batch_size: int,
+        concurrency: int,
+        index: str | None = None,
+    ) -> SearchSyncReport:
+        products = await session.stream_scalars(statement.execution_options(yield_per=batch_size))
+
+        async def batches() -> AsyncGenerator[list[ProductDocument]]:
+            async for chunk in products.partitions():
+                yield [ProductDocument.from_product(product) for product in chunk]
+
+        return await bulk_index(batches(), concurrency=concurrency, index=index)
+
+    # noinspection PyTypeChecker,Pydantic
+    @staticmethod
+    @logfire.instrument(record_return=True)
+    async def _prune_deleted_products(
+        session: AsyncSession, index: str, batch_size: int, concurrency: int
+    ) -> SearchSyncReport:
+        """Delete documents of products that no longer exist in the database."""
+        search = ProductDocument.search(index=index).source(fields=False).params(size=batch_size)
+
+        async def build_delete_actions(product_ids: list[UUID]) -> list[BulkAction]:
+            statement = select(Product.id).where(Product.id.in_(product_ids))
+            existing_product_ids = set((await session.exec(statement)).all())
+
+            return [
+                build_delete_action(product_id)
+                for product_id in product_ids
+                if product_id not in existing_product_ids
+            ]
+
+        async def batches() -> AsyncGenerator[list[BulkAction]]:
+            product_ids: list[UUID] = []
+
+            async for document in search.scan():
+                product_ids.append(UUID(document.meta.id))
+
+                if len(product_ids) == batch_size:
+                    yield await build_delete_actions(product_ids)
+                    product_ids = []
+
+            if product_ids:
+                yield await build_delete_actions(product_ids)
+
+        return await bulk_index(batches(), concurrency=concurrency, index=index)
+
+    @classmethod
+    @logfire.instrument
+    async def notify_products_indexed(cls, product_ids: Collection[UUID] | None = None) -> None:
+        """:param product_ids: indexed products, all products are looked up again if omitted"""
+        if product_ids is None:
+            await pg_async_events.notify(PRODUCTS_INDEXED_NOTIFICATION_CHANNEL, None)
+            return
+
+        product_ids = [str(product_id) for product_id in product_ids]
+
+        for start in range(0, len(product_ids), PRODUCT_IDS_PER_NOTIFICATION):
+            await pg_async_events.notify(
+                PRODUCTS_INDEXED_NOTIFICATION_CHANNEL,
+                {"product_ids": product_ids[start : start + PRODUCT_IDS_PER_NOTIFICATION]},
             )
+
+    @classmethod
+    async def products_indexed_listener(cls) -> None:
+        async for payload in pg_async_events.subscribe(PRODUCTS_INDEXED_NOTIFICATION_CHANNEL):
+            try:
+                await cls.handle_products_indexed_notification(payload)
+            except Exception:
+                logfire.exception("Failed to update product lookups")
+
+    @classmethod
+    @logfire.instrument
+    async def handle_products_indexed_notification(cls, payload: dict[str, Any] | None) -> None:
+        if payload is None:
+            await cls.refresh_product_lookups()
         else:
-            search = search.query(
-                FunctionScore(
-                    query=MatchAll(),
-                    functions=[RandomScore(seed=get_current_hour_seed(), field="_seq_no")],
-                )
+            await cls.update_product_lookups(
+                [UUID(product_id) for product_id in payload["product_ids"]]
+            )
+
+        cls._search_cache.clear()
+        cls._suggestion_cache.clear()
+
+    @classmethod
+    @logfire.instrument
+    async def refresh_product_lookups(cls) -> None:
+        """Rebuild article lookup and suggestion index with a single scan of products."""
+        async with start_primary_readonly_session() as session:
+            entries = await cls._load_product_lookup_entries(session=session)
+
+        suggestion_weights: Counter[str] = Counter()
+        for _article, suggestions, weight in entries.values():
+            for suggestion in suggestions:
+                suggestion_weights[suggestion] += weight
+
+        cls._product_lookup_entries = entries
+        cls._article_product_ids = {
+            article: product_id for product_id, (article, _suggestions, _weight) in entries.items()
+        }
+        cls._suggestion_weights = suggestion_weights
+        cls._suggestion_index = SuggestionIndex(suggestion_weights)
+
+    @classmethod
+    @logfire.instrument
+    async def update_product_lookups(cls, product_ids: Collection[UUID]) -> None:
+        """Update article lookup and suggestion index for given (changed or deleted) products."""
+        async with start_primary_readonly_session() as session:
+            entries = await cls._load_product_lookup_entries(
+                session=session, product_ids=product_ids
             )
 
-        search = search[0:limit]
+        # copies are swapped in at once, readers never see a half-updated lookup
+        article_product_ids = cls._article_product_ids.copy()
+        suggestion_weights = cls._suggestion_weights.copy()
+
+        for product_id in product_ids:
+            if (previous := cls._product_lookup_entries.pop(product_id, None)) is not None:
+                article, suggestions, weight = previous
 
-        response = await search.execute()
+                if article_product_ids.get(article) == product_id:
+                    del article_product_ids[article]
 
-        return [hit.name_suggest for hit in response.hits]
+                for suggestion in suggestions:
+                    suggestion_weights[suggestion] -= weight
+                    if suggestion_weights[suggestion] <= 0:
+                        del suggestion_weights[suggestion]
+
+            if (current := entries.get(product_id)) is not None:
+                article, suggestions, weight = current
+
+                article_product_ids[article] = product_id
+                for suggestion in suggestions:
+                    suggestion_weights[suggestion] += weight
+
+                cls._product_lookup_entries[product_id] = current
+
+        cls._article_product_ids = article_product_ids
+        cls._suggestion_weights = suggestion_weights
+        cls._suggestion_index = SuggestionIndex(suggestion_weights)
 
     # noinspection PyTypeChecker,Pydantic
     @staticmethod
-    @logfire.instrument(record_return=True)
-    async def sync_products(session: AsyncSession, since: datetime) -> int:
+    async def _load_product_lookup_entries(
+        session: AsyncSession, product_ids: Collection[UUID] | None = None
+    ) -> dict[UUID, ProductLookupEntry]:
+        """:param product_ids: products to load, all products if omitted"""
+        like_counts = (
+            select(Interaction.product_id, func.count().label("count"))
+            .where(Interaction.interaction_type == InteractionType.LIKE)
+            .group_by(Interaction.product_id)
+        )
+        statement = select(
+            Product.id,
+            Product.article,
+            Product.name,
+            Product.brand,
+            Product.category,
+        )
+
+        if product_ids is not None:
+            like_counts = like_counts.where(Interaction.product_id.in_(product_ids))
+            statement = statement.where(Product.id.in_(product_ids))
+
+        like_counts = like_counts.subquery()
+        statement = statement.add_columns(func.coalesce(like_counts.c.count, 0)).outerjoin(
+            like_counts, like_counts.c.product_id == Product.id
+        )
+
+        # every product and every like makes its name, brand and category more popular
+        return {
+            product_id: (article, (name, brand, category), 1 + like_count)
+            for product_id, article, name, brand, category, like_count in (
+                await session.exec(statement)
+            ).all()
+        }
+
+    @classmethod
+    async def product_change_listener(cls) -> None:
         """
-        Sync product index with database.
+        Keep product index in sync with changes reported by database triggers.
 
-        :return: number of products synced
+        Only one worker indexes at a time. Changes are collected for a short debounce window
+        and then indexed with a single bulk request.
         """
-        statement = select(Product).where(Product.updated_at >= since)
-        products = (await session.exec(statement)).all()
+        while True:
+            try:
+                async with acquire_leadership(PRODUCT_INDEXER_LEADERSHIP_NAME):
+                    logfire.info("Acquired product indexer leadership")
+                    await cls._index_product_changes()
+            except LeadershipLostError:
+                logfire.warn("Lost product indexer leadership")
 
-        for product in products:
-            await ProductDocument.from_product(product).save()
+    @classmethod
+    async def _index_product_changes(cls) -> None:
+        changed_product_ids: asyncio.Queue[UUID] = asyncio.Queue()
 
-        return len(products)
+        async def receive() -> None:
+            async for product_id in pg_async_events.subscribe(PRODUCT_CHANGE_NOTIFICATION_CHANNEL):
+                changed_product_ids.put_nowait(UUID(product_id))
 
-    @classmethod
+        async with asyncio.TaskGroup() as task_group:
+            task_group.create_task(receive())
+
+            while True:
+                product_ids = {await changed_product_ids.get()}
+
+                with suppress(TimeoutError):
+                    async with asyncio.timeout(SEARCH_INDEXER_DEBOUNCE):
+                        while len(product_ids) < SEARCH_SYNC_BATCH_SIZE:
+                            product_ids.add(await changed_product_ids.get())
+
+                try:
+                    await cls._index_products_by_ids(product_ids)
+                    await cls.notify_products_indexed(product_ids)
+                except Exception:
+                    logfire.exception("Failed to index changed products, retrying later")
+
+                    for product_id in product_ids:
+                        changed_product_ids.put_nowait(product_id)
+                    await asyncio.sleep(SEARCH_INDEXER_DEBOUNCE)
+
+    # noinspection PyTypeChecker,PyUnresolvedReferences,Pydantic
+    @staticmethod
     @logfire.instrument(record_return=True)
-    async def get_meta(cls) -> SearchMeta:
-        async with cls._meta_cache_lock.read():
-            return cls._meta_cache
+    async def _index_products_by_ids(product_ids: Collection[UUID]) -> SearchSyncReport:
+        """Upsert given products into the index, deleting the ones that no longer exist."""
+        async with start_primary_readonly_session() as session:
+            statement = select(Product).where(Product.id.in_(product_ids))
+            products = (await session.exec(statement)).all()
+
+        existing_product_ids = {product.id for product in products}
+
+        actions: list[BulkAction] = [ProductDocument.from_product(product) for product in products]
+        actions.extend(
+            build_delete_action(product_id)
+            for product_id in product_ids
+            if product_id not in existing_product_ids
+        )
+
+        async def batches() -> AsyncGenerator[list[BulkAction]]:
+            yield actions
+
+        return await bulk_index(batches(), concurrency=1)
+
+    @classmethod
+    def get_meta(cls) -> SearchMetaSnapshot:
+        return cls._meta_snapshot
 
     @classmethod
     @logfire.instrument
@@ -164,44 +1096,108 @@ class SearchService:
 
     @classmethod
     async def meta_refresh_listener(cls) -> None:
+        """
+        Compute meta on refresh requests and publish it to all workers.
+
+        Only one worker computes at a time, the others receive the result with the notification.
+        """
+        while True:
+            try:
+                async with acquire_leadership(META_LEADERSHIP_NAME):
+                    logfire.info("Acquired search meta leadership")
+                    await cls._publish_meta_on_refresh()
+            except LeadershipLostError:
+                logfire.warn("Lost search meta leadership")
+
+    @classmethod
+    async def _publish_meta_on_refresh(cls) -> None:
         async for _notification in pg_async_events.subscribe(META_REFRESH_NOTIFICATION_CHANNEL):
-            await cls.handle_meta_refresh_notification()
+            try:
+                await cls.publish_meta()
+            except Exception:
+                logfire.exception("Failed to publish search meta")
 
     @classmethod
     @logfire.instrument
-    async def handle_meta_refresh_notification(cls) -> None:
-        async with start_readonly_session() as session:
-            new_meta = await cls._compute_meta(session=session)
+    async def publish_meta(cls) -> None:
+        async with start_primary_readonly_session() as session:
+            meta = await cls._compute_meta(session=session)
 
-        async with cls._meta_cache_lock.write():
-            cls._meta_cache = new_meta
+        payload = meta.model_dump(mode="json")
+
+        if len(json.dumps(payload).encode()) >= MAX_NOTIFICATION_PAYLOAD_SIZE:
+            logfire.warn("Search meta is too large for a notification, workers will compute it")
+            payload = None
+
+        await pg_async_events.notify(META_NOTIFICATION_CHANNEL, payload)
+
+    @classmethod
+    async def meta_listener(cls) -> None:
+        async for payload in pg_async_events.subscribe(META_NOTIFICATION_CHANNEL):
+            try:
+                await cls.handle_meta_notification(payload)
+            except Exception:
+                logfire.exception("Failed to update search meta")
+
+    @classmethod
+    @logfire.instrument
+    async def handle_meta_notification(cls, payload: dict[str, Any] | None) -> None:
+        """:param payload: published meta, or `None` if it has to be computed locally"""
+        if payload is None:
+            await cls.load_meta()
+            return
+
+        cls._swap_meta(SearchMeta.model_validate(payload))
 
-    # noinspection PyTypeChecker,Pydantic
     @classmethod
+    @logfire.instrument
+    async def load_meta(cls) -> None:
+        async with start_primary_readonly_session() as session:
+            cls._swap_meta(await cls._compute_meta(session=session))
+
+    @classmethod
+    def _swap_meta(cls, meta: SearchMeta) -> None:
+        snapshot = SearchMetaSnapshot.build(meta, version=cls._meta_snapshot.version + 1)
+
+        if snapshot.etag != cls._meta_snapshot.etag:
+            cls._meta_snapshot = snapshot  # atomic swap, readers see either old or new snapshot
+
+    # noinspection PyTypeChecker,Pydantic
+    @staticmethod
     @logfire.instrument(record_return=True)
-    async def _compute_meta(cls, session: AsyncSession) -> SearchMeta:
-        all_brands: Sequence[str] = (
-            (
-                await session.exec(
-                    select(Product.brand).distinct().order_by(Product.brand)
-                )
-            ).all()
-        )  # fmt: skip
-        all_categories: Sequence[str] = (
-            (
-                await session.exec(
-                    select(Product.category).distinct().order_by(Product.category)
-                )
-            ).all()
-        )  # fmt: skip
-        color_dict: dict[str, str] = dict(
-            (
-                await session.exec(
-                    select(Product.color_name, Product.color_code)
-                    .distinct(Product.color_name)  # postgres-specific
-                    .order_by(Product.color_name)
-                )
-            ).all()
+    async def _compute_meta(session: AsyncSession) -> SearchMeta:
+        """Collect all filter values with a single scan of products."""
+        product_size = (
+            func.unnest(Product.sizes)
+            .table_valued("size")
+            .render_derived(name="product_size")
+            .lateral()
         )
 
-        return SearchMeta(brands=all_brands, categories=all_categories, colors=color_dict)
+        statement = (
+            select(
+                func.array_agg(aggregate_order_by(distinct(Product.brand), Product.brand)),
+                func.array_agg(aggregate_order_by(distinct(Product.category), Product.category)),
+                func.jsonb_object_agg(Product.color_name, Product.color_code, type_=JSONB),
+                func.array_agg(distinct(func.split_part(product_size.c.size, "/", 1))).filter(
+                    product_size.c.size.is_not(None)
+                ),
+                func.min(Product.discount_price),
+                func.max(Product.discount_price),
+            )
+            .select_from(Product)
+            .outerjoin(product_size, true())
+        )
+
+        brands, categories, colors, sizes, min_price, max_price = (
+            await session.exec(statement)
+        ).one()
+
+        return SearchMeta(
+            brands=brands or [],
+            categories=categories or [],
+            colors=dict(sorted((colors or {}).items())),
+            sizes=sorted(sizes or []),
+            min_price=min_price,
+            max_price=max_price,
+        )
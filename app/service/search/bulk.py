@@ -0,0 +1,123 @@
+import asyncio
+import time
+from collections.abc import AsyncIterable, AsyncIterator, Sequence
+from http import HTTPStatus
+from typing import Any
+from uuid import UUID
+
+import logfire
+
+from app.model import SearchSyncBatchFailure, SearchSyncReport
+
+from .config import PRODUCT_INDEX_ALIAS
+from .indexes import Product as ProductDocument
+
+MAX_REPORTED_ERRORS_PER_BATCH = 5
+MAX_RETRIES_ON_REJECTION = 3
+
+type BulkAction = ProductDocument | dict[str, Any]
+
+
+async def bulk_index(
+    batches: AsyncIterable[Sequence[BulkAction]],
+    concurrency: int,
+    index: str | None = None,
+) -> SearchSyncReport:
+    """
+    Send document batches through the Elasticsearch `_bulk` API.
+
+    Each batch becomes exactly one `_bulk` request, at most `concurrency` requests are in flight.
+    Failed documents do not abort the sync, they are collected into the report instead.
+
+    :param index: concrete index to write to instead of the alias
+    """
+    started_at = time.perf_counter()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    synced = 0
+    batch_count = 0
+    failed_batches: list[SearchSyncBatchFailure] = []
+
+    async def send(batch_number: int, documents: Sequence[BulkAction]) -> None:
+        nonlocal synced
+
+        try:
+            with logfire.span(
+                "Bulk indexing batch {batch_number}",
+                batch_number=batch_number,
+                size=len(documents),
+            ):
+                success_count, errors = await ProductDocument.bulk(
+                    _iterate(_build_actions(documents, index=index)),
+                    chunk_size=len(documents),
+                    max_retries=MAX_RETRIES_ON_REJECTION,
+                    raise_on_error=False,
+                    raise_on_exception=False,
+                    # deleting a document that has never been indexed is not a failure
+                    ignore_status=(HTTPStatus.NOT_FOUND,),
+                )
+        finally:
+            semaphore.release()
+
+        synced += success_count
+
+        if errors:
+            failed_batches.append(
+                SearchSyncBatchFailure(
+                    batch=batch_number,
+                    failed=len(errors),
+                    errors=[_format_error(e) for e in errors[:MAX_REPORTED_ERRORS_PER_BATCH]],
+                )
+            )
+            logfire.warn(
+                "{failed} documents failed to index in batch {batch_number}",
+                failed=len(errors),
+                batch_number=batch_number,
+            )
+
+    async with asyncio.TaskGroup() as task_group:
+        async for documents in batches:
+            if not documents:
+                continue
+
+            await semaphore.acquire()
+            task_group.create_task(send(batch_count, documents))
+            batch_count += 1
+
+    duration = time.perf_counter() - started_at
+
+    return SearchSyncReport(
+        synced=synced,
+        failed=sum(batch.failed for batch in failed_batches),
+        batches=batch_count,
+        failed_batches=sorted(failed_batches, key=lambda batch: batch.batch),
+        duration=duration,
+        throughput=synced / duration if duration else 0.0,
+    )
+
+
+def build_delete_action(product_id: UUID) -> dict[str, Any]:
+    return {"_op_type": "delete", "_index": PRODUCT_INDEX_ALIAS, "_id": product_id}
+
+
+def _build_actions(documents: Sequence[BulkAction], index: str | None) -> Sequence[BulkAction]:
+    if index is None:
+        return documents
+
+    return [
+        {**document, "_index": index}
+        if isinstance(document, dict)
+        else {"_index": index, "_id": document.meta.id, "_source": document}
+        for document in documents
+    ]
+
+
+async def _iterate[T](items: Sequence[T]) -> AsyncIterator[T]:
+    for item in items:
+        yield item
+
+
+def _format_error(error: dict[str, Any]) -> str:
+    """Format an item of `async_bulk` error list, which looks like `{op_type: {...}}`."""
+    details = next(iter(error.values()))
+    return f"{details.get('_id')}: {details.get('error')}"
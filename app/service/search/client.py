@@ -1,31 +1,88 @@
 import asyncio
+import random
+from http import HTTPStatus
 
 import logfire
 from elasticsearch.dsl import async_connections
 
-from app.core.config import ELASTIC_HOST, ELASTIC_PASSWORD, ELASTIC_USERNAME
+from app.core.config import (
+    ELASTIC_CONNECTIONS_PER_NODE,
+    ELASTIC_HOST,
+    ELASTIC_HTTP_COMPRESS,
+    ELASTIC_INDEXING_TIMEOUT,
+    ELASTIC_MAX_RETRIES,
+    ELASTIC_PASSWORD,
+    ELASTIC_RETRY_BACKOFF,
+    ELASTIC_SEARCH_TIMEOUT,
+    ELASTIC_USERNAME,
+)
+
+from .config import INDEXING_CONNECTION_ALIAS, SEARCH_CONNECTION_ALIAS
+from .versioning import ensure_product_index
 
-from .indexes import Product
+RETRY_BACKOFF_CAP = 5  # seconds, max delay between retries of a single request
+INIT_RETRY_BACKOFF_BASE = 1  # seconds
+INIT_RETRY_BACKOFF_CAP = 30  # seconds
 
+_common_connection_options = {
+    "hosts": ELASTIC_HOST,
+    "basic_auth": (ELASTIC_USERNAME, ELASTIC_PASSWORD),
+    "connections_per_node": ELASTIC_CONNECTIONS_PER_NODE,
+    "http_compress": ELASTIC_HTTP_COMPRESS,
+    "max_retries": ELASTIC_MAX_RETRIES,
+    "retry_backoff_base": ELASTIC_RETRY_BACKOFF,
+    "retry_backoff_cap": RETRY_BACKOFF_CAP,
+}
+
+# search does not retry timeouts or overload, so requests fail fast instead of piling up
 async_connections.create_connection(
-    hosts=ELASTIC_HOST, basic_auth=(ELASTIC_USERNAME, ELASTIC_PASSWORD)
+    alias=SEARCH_CONNECTION_ALIAS,
+    request_timeout=ELASTIC_SEARCH_TIMEOUT,
+    retry_on_timeout=False,
+    retry_on_status=(HTTPStatus.BAD_GATEWAY, HTTPStatus.GATEWAY_TIMEOUT),
+    **_common_connection_options,
+)
+async_connections.create_connection(
+    alias=INDEXING_CONNECTION_ALIAS,
+    request_timeout=ELASTIC_INDEXING_TIMEOUT,
+    retry_on_timeout=True,
+    retry_on_status=(
+        HTTPStatus.TOO_MANY_REQUESTS,
+        HTTPStatus.BAD_GATEWAY,
+        HTTPStatus.SERVICE_UNAVAILABLE,
+        HTTPStatus.GATEWAY_TIMEOUT,
+    ),
+    **_common_connection_options,
 )
 
 
 async def initialize_elastic() -> None:
     logfire.info("Connecting to Elastic...")
 
+    attempt = 0
+
     while True:
         try:
-            await Product.init()
+            await ensure_product_index()
 
             logfire.info("Successfully connected to Elastic.")
             break
 
         except Exception:
-            logfire.info("Elastic is not ready yet. Retrying in 3 seconds...", _exc_info=True)
-            await asyncio.sleep(3)
+            # full jitter, so that restarted workers do not retry in lockstep
+            delay = random.uniform(  # noqa: S311
+                0, min(INIT_RETRY_BACKOFF_CAP, INIT_RETRY_BACKOFF_BASE * 2**attempt)
+            )
+            attempt += 1
+
+            logfire.info(
+                "Elastic is not ready yet. Retrying in {delay:.1f} seconds...",
+                delay=delay,
+                _exc_info=True,
+            )
+            await asyncio.sleep(delay)
 
 
 async def dispose_elastic() -> None:
-    await async_connections.get_connection().close()
+    for alias in (SEARCH_CONNECTION_ALIAS, INDEXING_CONNECTION_ALIAS):
+        await async_connections.get_connection(alias).close()
@@ -1 +1,16 @@
-PRODUCT_INDEX_NAME = "products"
+SEARCH_CONNECTION_ALIAS = "default"  # user-facing requests, fail fast
+INDEXING_CONNECTION_ALIAS = "indexing"  # bulk indexing and index maintenance, patient
+
+PRODUCT_INDEX_ALIAS = "products"
+PRODUCT_INDEX_VERSION_PREFIX = f"{PRODUCT_INDEX_ALIAS}_v"
+
+INDEX_MAINTENANCE_TIMEOUT = 3600  # seconds, for force-merge and other long-running admin calls
+
+SEARCH_CURSOR_KEEP_ALIVE = "10m"  # point-in-time lifetime, extended by every page request
+
+SEARCH_FACET_SIZE = 100  # max buckets per terms facet
+SEARCH_PRICE_HISTOGRAM_INTERVAL = 1000  # width of a price facet bucket
+
+SEARCH_PROFILE_MAX_VALUES = 10  # most liked or disliked values per field kept in a user profile
+SEARCH_PERSONALIZATION_STRENGTH = 0.5  # max relative score boost (or penalty) from preferences
+SEARCH_PROFILE_MAX_DISLIKED = 1000  # most disliked products excluded from search for a user
@@ -0,0 +1,24 @@
+import base64
+from typing import Any, Self
+
+from pydantic import BaseModel
+
+from app.core.exceptions import SearchCursorInvalidError
+
+
+class SearchCursor(BaseModel):
+    """State of cursor pagination, passed to the client as an opaque string."""
+
+    pit_id: str
+    search_after: list[Any]
+    seed: int
+
+    def encode(self) -> str:
+        return base64.urlsafe_b64encode(self.model_dump_json().encode()).decode()
+
+    @classmethod
+    def decode(cls, cursor: str) -> Self:
+        try:
+            return cls.model_validate_json(base64.urlsafe_b64decode(cursor))
+        except ValueError as e:
+            raise SearchCursorInvalidError from e
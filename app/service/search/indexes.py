@@ -2,16 +2,20 @@ from typing import ClassVar, Self
 
 from elasticsearch.dsl import (
     AsyncDocument,
+    AsyncIndex,
+    Completion,
     Float,
     Keyword,
+    Object,
     SearchAsYouType,
     Text,
     analysis,
 )
 
+from app.model import BRIEF_PRODUCT_FIELDS
 from app.model import Product as ProductModel
 
-from .config import PRODUCT_INDEX_NAME
+from .config import INDEXING_CONNECTION_ALIAS, PRODUCT_INDEX_ALIAS
 
 russian_analyzer = analysis.analyzer(
     "russian_analyzer",
@@ -28,15 +32,19 @@ class Product(AsyncDocument):
     article = Keyword()
     name = Text(analyzer=russian_analyzer, fields={"raw": Keyword()})
     name_suggest = SearchAsYouType(analyzer=russian_analyzer)
+    suggest = Completion()  # fuzzy suggestions of name, brand and category
     brand = Keyword()
     category = Keyword()
     color_name = Keyword()
     sizes = Keyword(multi=True)
     description = Text(analyzer=russian_analyzer)
     price = Float()
+    # not indexed, lets search return ready product cards without a database round trip
+    card = Object(enabled=False)
 
     class Index:
-        name = PRODUCT_INDEX_NAME
+        name = PRODUCT_INDEX_ALIAS
+        using = INDEXING_CONNECTION_ALIAS  # searches are built separately on the search connection
         settings: ClassVar = {"number_of_shards": 1, "number_of_replicas": 0}
         analyzers: ClassVar = [russian_analyzer]
 
@@ -48,10 +56,17 @@ class Product(AsyncDocument):
             article=product.article,
             name=product.name,
             name_suggest=product.name,
+            suggest=[product.name, product.brand, product.category],
             brand=product.brand,
             category=product.category,
             color_name=product.color_name,
             sizes=[size.split("/")[0] for size in product.sizes],
             description=product.description,
             price=product.discount_price,
+            card=product.model_dump(mode="json", include=set(BRIEF_PRODUCT_FIELDS)),
         )
+
+
+def build_product_index(name: str) -> AsyncIndex:
+    """Build product index definition (settings, analyzers, mappings) under a concrete name."""
+    return Product._index.clone(name=name)  # noqa: SLF001
@@ -0,0 +1,38 @@
+import hashlib
+from typing import Self
+
+from pydantic import BaseModel, ConfigDict
+
+from app.model import SearchMeta
+
+
+class SearchMetaSnapshot(BaseModel):
+    """
+    Immutable search metadata, serialized once and served as is.
+
+    Snapshots are never modified, a refresh builds a new one and swaps the reference,
+    so readers need no locking.
+    """
+
+    model_config = ConfigDict(frozen=True)
+
+    version: int
+    meta: SearchMeta
+    body: bytes  # JSON-serialized meta
+    etag: str  # content-based, so it is the same on every worker
+
+    @classmethod
+    def build(cls, meta: SearchMeta, version: int) -> Self:
+        body = meta.model_dump_json().encode()
+        etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+        return cls(version=version, meta=meta, body=body, etag=etag)
+
+    def matches(self, if_none_match: str | None) -> bool:
+        """Check `If-None-Match` header value (list of possibly weak ETags) against the snapshot."""
+        if if_none_match is None:
+            return False
+
+        return any(
+            tag.strip().removeprefix("W/") in {self.etag, "*"} for tag in if_none_match.split(",")
+        )
@@ -0,0 +1,104 @@
+from collections import Counter
+from collections.abc import Iterable
+from typing import Self
+from uuid import UUID
+
+from elasticsearch.dsl.function import BoostFactor
+from elasticsearch.dsl.query import Ids, Term
+from pydantic import BaseModel
+
+from app.model import InteractionType
+
+from .config import (
+    SEARCH_PERSONALIZATION_STRENGTH,
+    SEARCH_PROFILE_MAX_DISLIKED,
+    SEARCH_PROFILE_MAX_VALUES,
+)
+
+PROFILE_FIELDS = ("brand", "category", "color_name")  # indexed fields matching product columns
+
+
+class SearchProfile(BaseModel):
+    """Compact user preferences used to personalize search ranking."""
+
+    affinity: dict[str, dict[str, float]] = {}  # indexed field -> value -> affinity in (-1, 1)
+    disliked_product_ids: frozenset[UUID] = frozenset()  # excluded from search results
+
+    @classmethod
+    def from_interactions(
+        cls,
+        counts: Iterable[tuple[str, str, str, InteractionType, int]],
+        disliked_product_ids: Iterable[UUID],
+    ) -> Self:
+        """
+        Build profile from interaction counts grouped by product attributes.
+
+        Affinity of a value is its like/dislike balance damped by the number of interactions,
+        only the strongest values of each field are kept.
+
+        :param counts: rows of (brand, category, color_name, interaction_type, count)
+        """
+        balances = {field: Counter() for field in PROFILE_FIELDS}
+        totals = {field: Counter() for field in PROFILE_FIELDS}
+
+        for *values, interaction_type, count in counts:
+            sign = 1 if interaction_type == InteractionType.LIKE else -1
+
+            for field, value in zip(PROFILE_FIELDS, values, strict=True):
+                balances[field][value] += sign * count
+                totals[field][value] += count
+
+        affinity = {}
+
+        for field in PROFILE_FIELDS:
+            value_affinity = {
+                value: balances[field][value] / (total + 1)
+                for value, total in totals[field].items()
+                if balances[field][value]
+            }
+            strongest = sorted(value_affinity, key=lambda value: abs(value_affinity[value]))
+            strongest = strongest[-SEARCH_PROFILE_MAX_VALUES:]
+
+            if strongest:
+                affinity[field] = {value: value_affinity[value] for value in strongest}
+
+        return cls(affinity=affinity, disliked_product_ids=frozenset(disliked_product_ids))
+
+    def apply_interaction(self, product_id: UUID, interaction_type: InteractionType) -> None:
+        """
+        Keep disliked products up to date without reloading the whole profile.
+
+        A new dislike is always added, even beyond `SEARCH_PROFILE_MAX_DISLIKED`,
+        see `is_over_disliked_limit`.
+        """
+        if interaction_type == InteractionType.LIKE:
+            self.disliked_product_ids -= {product_id}
+        else:
+            self.disliked_product_ids |= {product_id}
+
+    @property
+    def is_over_disliked_limit(self) -> bool:
+        """Profile should be reloaded, keeping only the most recent dislikes."""
+        return len(self.disliked_product_ids) > SEARCH_PROFILE_MAX_DISLIKED
+
+    def build_cache_key(self) -> tuple:
+        # frozenset caches its hash, so repeated lookups with the same profile stay cheap
+        return self.model_dump_json(exclude={"disliked_product_ids"}), self.disliked_product_ids
+
+    def build_exclusion(self) -> Ids | None:
+        if not self.disliked_product_ids:
+            return None
+
+        return Ids(values=[str(product_id) for product_id in self.disliked_product_ids])
+
+    def build_score_functions(self) -> list[BoostFactor]:
+        """:return: weights multiplying the score of products with preferred or avoided values"""
+        # noinspection PyTypeChecker
+        return [
+            BoostFactor(
+                filter=Term(field, value),
+                weight=1 + SEARCH_PERSONALIZATION_STRENGTH * value_affinity,
+            )
+            for field, values in self.affinity.items()
+            for value, value_affinity in values.items()
+        ]
@@ -0,0 +1,48 @@
+import bisect
+import heapq
+from collections.abc import Mapping
+
+
+class SuggestionIndex:
+    """
+    Immutable in-memory prefix index of weighted suggestions.
+
+    Every suggestion is reachable by a prefix of any of its words,
+    lookups are a binary search followed by a scan of matching keys.
+    """
+
+    def __init__(self, weights: Mapping[str, int]) -> None:
+        """:param weights: suggestion -> popularity"""
+        entries = sorted(
+            (key, suggestion) for suggestion in weights for key in self._build_keys(suggestion)
+        )
+
+        self._keys = [key for key, _suggestion in entries]
+        self._suggestions = [suggestion for _key, suggestion in entries]
+        self._weights = dict(weights)
+
+        self._most_popular = sorted(self._weights, key=self._rank)
+
+    def __len__(self) -> int:
+        return len(self._weights)
+
+    def suggest(self, prefix: str | None, limit: int) -> list[str]:
+        """:return: distinct most popular suggestions with a word starting with the prefix"""
+        if not prefix:
+            return self._most_popular[:limit]
+
+        prefix = prefix.casefold()
+
+        start = bisect.bisect_left(self._keys, prefix)
+        end = bisect.bisect_left(self._keys, prefix + "\U0010ffff", lo=start)
+
+        return heapq.nsmallest(limit, set(self._suggestions[start:end]), key=self._rank)
+
+    def _rank(self, suggestion: str) -> tuple[int, str]:
+        return -self._weights[suggestion], suggestion
+
+    @staticmethod
+    def _build_keys(suggestion: str) -> set[str]:
+        words = suggestion.casefold().split()
+
+        return {" ".join(words[position:]) for position in range(len(words))}
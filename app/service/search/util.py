@@ -1,5 +1,13 @@
 import re
 import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from http import HTTPStatus
+
+from elasticsearch import ApiError, ConnectionError, ConnectionTimeout  # noqa: A004
+
+from app.core.exceptions import SearchUnavailableError
+from app.model import SearchQuery
 
 article_regex = re.compile(r"^[a-z\-]*\d[a-z\-]*$", re.IGNORECASE)
 
@@ -10,3 +18,37 @@ def is_article(query: str) -> bool:
 
 def get_current_hour_seed() -> int:
     return int(time.time() / 3600)
+
+
+def normalize_search_query(search_query: SearchQuery) -> SearchQuery:
+    """Bring equivalent queries to the same form, so they share cache entries."""
+    return search_query.model_copy(
+        update={
+            "query": (search_query.query or "").strip() or None,
+            "categories": _normalize_terms(search_query.categories),
+            "colors": _normalize_terms(search_query.colors),
+            "brands": _normalize_terms(search_query.brands),
+            "sizes": _normalize_terms(search_query.sizes),
+        }
+    )
+
+
+def normalize_suggestion_query(query: str | None) -> str | None:
+    return (query or "").strip().lower() or None
+
+
+def _normalize_terms(terms: list[str] | None) -> list[str] | None:
+    return sorted(set(terms)) if terms else None
+
+
+@contextmanager
+def raise_on_elastic_unavailability() -> Iterator[None]:
+    """Turn Elasticsearch connectivity failures, timeouts and overload into 503 responses."""
+    try:
+        yield
+    except (ConnectionError, ConnectionTimeout) as e:
+        raise SearchUnavailableError from e
+    except ApiError as e:
+        if e.status_code in {HTTPStatus.TOO_MANY_REQUESTS, HTTPStatus.SERVICE_UNAVAILABLE}:
+            raise SearchUnavailableError from e
+        raise
@@ -0,0 +1,143 @@
+import re
+
+import logfire
+from elasticsearch import BadRequestError
+from elasticsearch.dsl import async_connections
+from elasticsearch.dsl.exceptions import IllegalOperation
+
+from .config import (
+    INDEX_MAINTENANCE_TIMEOUT,
+    INDEXING_CONNECTION_ALIAS,
+    PRODUCT_INDEX_ALIAS,
+    PRODUCT_INDEX_VERSION_PREFIX,
+)
+from .indexes import Product as ProductDocument
+from .indexes import build_product_index
+
+_version_regex = re.compile(rf"^{re.escape(PRODUCT_INDEX_VERSION_PREFIX)}(\d+)$")
+
+
+async def ensure_product_index() -> None:
+    """
+    Make sure the alias points to an index with up-to-date mappings.
+
+    Creates an empty first version if there is nothing yet.
+    Changes that cannot be applied in place (e.g. analyzers) require a full reindex.
+    """
+    client = async_connections.get_connection(INDEXING_CONNECTION_ALIAS)
+
+    if await client.indices.exists_alias(name=PRODUCT_INDEX_ALIAS):
+        existing_indices = await get_aliased_indices()
+    elif await client.indices.exists(index=PRODUCT_INDEX_ALIAS):
+        logfire.warn(
+            "Index {index} is not versioned yet, full reindex is required to move it under alias",
+            index=PRODUCT_INDEX_ALIAS,
+        )
+        existing_indices = [PRODUCT_INDEX_ALIAS]
+    else:
+        existing_indices = []
+
+    for index_name in existing_indices:
+        try:
+            await build_product_index(index_name).save()
+        except IllegalOperation:
+            logfire.warn(
+                "Analysis settings of {index} are outdated, full reindex is required",
+                index=index_name,
+            )
+
+    if existing_indices:
+        return
+
+    index = build_product_index(_build_version_name(await _get_next_version()))
+    index.aliases(**{PRODUCT_INDEX_ALIAS: {}})
+
+    try:
+        await index.create()
+    except BadRequestError as e:
+        if e.error != "resource_already_exists_exception":  # another worker was faster
+            raise
+
+
+async def get_aliased_indices() -> list[str]:
+    client = async_connections.get_connection(INDEXING_CONNECTION_ALIAS)
+
+    if not await client.indices.exists_alias(name=PRODUCT_INDEX_ALIAS):
+        return []
+
+    return list((await client.indices.get_alias(name=PRODUCT_INDEX_ALIAS)).body)
+
+
+async def create_versioned_index() -> str:
+    """
+    Create the next index version, tuned for bulk loading.
+
+    Refresh is disabled and replicas are dropped until `finalize_versioned_index` is called.
+
+    :return: name of the created index
+    """
+    index_name = _build_version_name(await _get_next_version())
+
+    index = build_product_index(index_name)
+    index.settings(refresh_interval="-1", number_of_replicas=0)
+    await index.create()
+
+    return index_name
+
+
+async def finalize_versioned_index(index_name: str) -> None:
+    """Restore regular settings of a bulk-loaded index, make its data visible and compact it."""
+    client = async_connections.get_connection(INDEXING_CONNECTION_ALIAS).options(
+        request_timeout=INDEX_MAINTENANCE_TIMEOUT
+    )
+
+    await client.indices.put_settings(
+        index=index_name,
+        settings={
+            "refresh_interval": None,
+            "number_of_replicas": ProductDocument.Index.settings["number_of_replicas"],
+        },
+    )
+    await client.indices.refresh(index=index_name)
+    await client.indices.forcemerge(index=index_name, max_num_segments=1)
+
+
+async def switch_alias(index_name: str) -> None:
+    """Atomically point the alias to the given index only, then delete all other versions."""
+    client = async_connections.get_connection(INDEXING_CONNECTION_ALIAS)
+
+    actions = [{"add": {"index": index_name, "alias": PRODUCT_INDEX_ALIAS}}]
+
+    if await client.indices.exists_alias(name=PRODUCT_INDEX_ALIAS):
+        actions.extend(
+            {"remove": {"index": previous_index, "alias": PRODUCT_INDEX_ALIAS}}
+            for previous_index in await get_aliased_indices()
+            if previous_index != index_name
+        )
+    elif await client.indices.exists(index=PRODUCT_INDEX_ALIAS):
+        # legacy concrete index occupies the alias name, drop it in the same atomic request
+        actions.append({"remove_index": {"index": PRODUCT_INDEX_ALIAS}})
+
+    await client.indices.update_aliases(actions=actions)
+
+    stale_indices = [name for name in await _get_versioned_indices() if name != index_name]
+    if stale_indices:
+        await client.indices.delete(index=",".join(stale_indices))
+
+
+async def _get_versioned_indices() -> list[str]:
+    client = async_connections.get_connection(INDEXING_CONNECTION_ALIAS)
+
+    resolved = await client.indices.resolve_index(name=f"{PRODUCT_INDEX_VERSION_PREFIX}*")
+
+    return [index["name"] for index in resolved["indices"] if _version_regex.match(index["name"])]
+
+
+async def _get_next_version() -> int:
+    versions = [int(_version_regex.match(name).group(1)) for name in await _get_versioned_indices()]
+
+    return max(versions, default=0) + 1
+
+
+def _build_version_name(version: int) -> str:
+    return f"{PRODUCT_INDEX_VERSION_PREFIX}{version}"
@@ -1,11 +1,12 @@
 import logfire
 from sqlalchemy.exc import InvalidRequestError
-from sqlalchemy.orm import load_only, selectinload
+from sqlalchemy.orm import selectinload
 from sqlmodel import delete, select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.core.config import Defaults
+from app.core.config import USER_CACHE_SIZE, USER_CACHE_TTL, Defaults
 from app.core.exceptions import UserNotFoundError
+from app.database import fetch
 from app.model import (
     AuthenticatedUser,
     AuthenticatedUserWithCollectionIds,
@@ -16,12 +17,20 @@ from app.model import (
     UserPatch,
 )
 
+from .cache import SharedCache
 from .collection import CollectionService
 from .util import check_update_needed
 
+_AUTHENTICATED_USER_QUERY = f'SELECT id FROM "{User.__tablename__}" WHERE telegram_id = $1'  # noqa: S608
+
 
 # noinspection PyTypeChecker,Pydantic
 class UserService:
+    # telegram_id -> authenticated user
+    authenticated_user_cache: SharedCache[int, AuthenticatedUser] = SharedCache(
+        "authenticated_user", max_size=USER_CACHE_SIZE, ttl=USER_CACHE_TTL
+    )
+
     @classmethod
     @logfire.instrument(record_return=True)
     async def get_or_upsert(cls, session: AsyncSession, user_create: UserCreate) -> User:
@@ -82,40 +91,38 @@ class UserService:
         except InvalidRequestError as e:
             raise UserNotFoundError from e
 
-    @staticmethod
+    @classmethod
     @logfire.instrument(record_return=True)
     async def get_authenticated(
-        session: AsyncSession, telegram_id: int
+        cls, session: AsyncSession, telegram_id: int
     ) -> AuthenticatedUser | None:
-        statement = select(User.id).where(User.telegram_id == telegram_id)
+        if (cached := cls.authenticated_user_cache.get(telegram_id)) is not None:
+            return cached.model_copy()
 
-        user_id_optional = (await session.exec(statement)).one_or_none()
+        records = await fetch(session, _AUTHENTICATED_USER_QUERY, telegram_id)
 
-        if user_id_optional is None:
-            return None
+        if not records:
+            return None  # not cached, the user is likely to be created right away
 
-        return AuthenticatedUser(id=user_id_optional, telegram_id=telegram_id)
+        user = AuthenticatedUser.model_construct(id=records[0]["id"], telegram_id=telegram_id)
 
-    @staticmethod
+        cls.authenticated_user_cache.set_loaded(session, telegram_id, user)
+        return user.model_copy()
+
+    @classmethod
     @logfire.instrument(record_return=True)
     async def get_authenticated_with_collection_ids(
-        session: AsyncSession, telegram_id: int
+        cls, session: AsyncSession, telegram_id: int
     ) -> AuthenticatedUserWithCollectionIds | None:
-        statement = (
-            select(User)
-            .where(User.telegram_id == telegram_id)
-            .options(load_only(User.id), selectinload(User.collections))
-        )
+        user = await cls.get_authenticated(session=session, telegram_id=telegram_id)
 
-        user_optional = (await session.exec(statement)).one_or_none()
-
-        if user_optional is None:
+        if user is None:
             return None
 
+        collection_ids = await CollectionService.get_ids_by_owner(session=session, owner_id=user.id)
+
         return AuthenticatedUserWithCollectionIds(
-            id=user_optional.id,
-            telegram_id=telegram_id,
-            collection_ids={collection.id for collection in user_optional.collections},
+            id=user.id, telegram_id=telegram_id, collection_ids=set(collection_ids)
         )
 
     @classmethod
@@ -129,12 +136,18 @@ class UserService:
 
         return user
 
-    @staticmethod
+    @classmethod
     @logfire.instrument(record_return=True)
-    async def delete(session: AsyncSession, user_id: int) -> None:
-        statement = delete(User).where(User.id == user_id)
+    async def delete(cls, session: AsyncSession, user_id: int) -> None:
+        statement = delete(User).where(User.id == user_id).returning(User.telegram_id)
+
+        telegram_id_optional = (await session.exec(statement)).scalar_one_or_none()
+
+        if telegram_id_optional is not None:
+            await cls.authenticated_user_cache.invalidate(session, [telegram_id_optional])
 
-        await session.exec(statement)
+        await CollectionService.collection_ids_cache.invalidate(session, [user_id])
+        await CollectionService.default_collection_cache.invalidate(session, [user_id])
 
     @staticmethod
     @logfire.instrument(record_return=True)
@@ -1,3 +1,5 @@
-__all__ = ["AsyncRWLock"]
+__all__ = ["AsyncRWLock", "SingleFlight", "TTLCache"]
 
+from .cache import TTLCache
 from .lock import AsyncRWLock
+from .singleflight import SingleFlight
@@ -0,0 +1,80 @@
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+
+import logfire
+
+_hits_counter = logfire.metric_counter("cache_hits", description="Cache lookups that found a value")
+_misses_counter = logfire.metric_counter(
+    "cache_misses", description="Cache lookups that found nothing or an expired value"
+)
+_evictions_counter = logfire.metric_counter(
+    "cache_evictions", description="Values dropped from cache to make room for new ones"
+)
+
+
+class TTLCache[K: Hashable, V]:
+    """
+    Simple in-process LRU cache with expiring entries.
+
+    - least recently used entry is evicted when `max_size` is reached
+    - entries expire `ttl` seconds after being set, unless a different ttl is given for the entry
+    - hits, misses and evictions are counted locally and exported as metrics
+    """
+
+    def __init__(self, name: str, max_size: int, ttl: float) -> None:
+        self.name = name
+        self.max_size = max_size
+        self.ttl = ttl
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._entries: OrderedDict[K, tuple[float, V]] = OrderedDict()  # key -> (expiry, value)
+        self._metric_attributes = {"cache": name}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get[D](self, key: K, default: D = None) -> V | D:
+        entry = self._entries.get(key)
+
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+
+            self.misses += 1
+            _misses_counter.add(1, self._metric_attributes)
+            return default
+
+        self._entries.move_to_end(key)
+
+        self.hits += 1
+        _hits_counter.add(1, self._metric_attributes)
+        return entry[1]
+
+    def peek[D](self, key: K, default: D = None) -> V | D:
+        """Get value without counting the lookup or marking the entry as recently used."""
+        entry = self._entries.get(key)
+
+        if entry is None or entry[0] <= time.monotonic():
+            return default
+
+        return entry[1]
+
+    def set(self, key: K, value: V, ttl: float | None = None) -> None:
+        self._entries[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+            self.evictions += 1
+            _evictions_counter.add(1, self._metric_attributes)
+
+    def pop(self, key: K) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
@@ -0,0 +1,52 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+
+import logfire
+
+_shared_counter = logfire.metric_counter(
+    "singleflight_shared", description="Calls served by an identical call already in flight"
+)
+
+
+class SingleFlight[K: Hashable, V]:
+    """
+    Collapse identical concurrent calls onto a single in-flight call.
+
+    - the first caller with a key runs the call, later callers await its result (or exception)
+    - if the running caller is cancelled, one of the waiting callers runs the call instead
+    - nothing is kept after the call completes, this is not a cache
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+        self._calls: dict[K, asyncio.Future[V]] = {}
+        self._metric_attributes = {"flight": name}
+
+    async def run(self, key: K, function: Callable[[], Awaitable[V]]) -> V:
+        while (future := self._calls.get(key)) is not None:
+            _shared_counter.add(1, self._metric_attributes)
+
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():  # this caller was cancelled, not the running one
+                    raise
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+
+        try:
+            result = await function()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # mark as retrieved, there might be no other callers
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
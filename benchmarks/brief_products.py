@@ -0,0 +1,105 @@
+"""
+Compare loading brief products through the ORM with the raw asyncpg fast path.
+
+Runs against the database configured by the usual environment variables:
+
+    uv run --group app -m benchmarks.brief_products --rows 100 --repeat 200
+
+CPU time of this process is reported per row, waiting for Postgres is not included,
+so the difference between the two paths is the cost of ORM and validation overhead.
+"""
+
+import asyncio
+import time
+from collections.abc import Awaitable, Callable, Sequence
+from typing import Annotated
+from uuid import UUID
+
+from sqlalchemy import bindparam
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.orm import load_only
+from sqlmodel import func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typer import Option, Typer
+
+from app.database import dispose_database, start_readonly_session
+from app.model import BRIEF_PRODUCT_FIELDS, BriefProductSchema, Product
+from app.service import ProductService
+
+cli = Typer()
+
+type Loader = Callable[[AsyncSession, Sequence[UUID]], Awaitable[list[BriefProductSchema]]]
+
+
+# noinspection PyTypeChecker,PyUnresolvedReferences,Pydantic
+async def load_with_orm(
+    session: AsyncSession, product_ids: Sequence[UUID]
+) -> list[BriefProductSchema]:
+    """Previous implementation of `ProductService._load_many_by_ids`."""
+    requested_ids = (
+        func.unnest(bindparam("product_ids", list(product_ids), type_=ARRAY(PG_UUID(as_uuid=True))))
+        .table_valued("id", with_ordinality="position")
+        .render_derived(name="requested_ids")
+    )
+
+    statement = (
+        select(Product)
+        .join(requested_ids, Product.id == requested_ids.c.id)
+        .order_by(requested_ids.c.position)
+        .options(load_only(*(getattr(Product, field) for field in BRIEF_PRODUCT_FIELDS)))
+    )
+
+    return [
+        BriefProductSchema.model_validate(
+            product, update={"is_contained_in_user_collections": False}
+        )
+        for product in (await session.exec(statement)).all()
+    ]
+
+
+async def load_raw(session: AsyncSession, product_ids: Sequence[UUID]) -> list[BriefProductSchema]:
+    return await ProductService._load_many_by_ids(session, product_ids)  # noqa: SLF001
+
+
+async def measure(loader: Loader, product_ids: Sequence[UUID], repeat: int) -> float:
+    """:return: CPU seconds per loaded row"""
+    async with start_readonly_session() as session:
+        await loader(session, product_ids)  # warm up statement caches
+
+        started_at = time.process_time()
+        for _ in range(repeat):
+            await loader(session, product_ids)
+
+        return (time.process_time() - started_at) / (repeat * len(product_ids))
+
+
+async def benchmark(rows: int, repeat: int) -> None:
+    try:
+        async with start_readonly_session() as session:
+            product_ids = (await session.exec(select(Product.id).limit(rows))).all()
+
+        if not product_ids:
+            print("No products in the database")
+            return
+
+        orm = await measure(load_with_orm, product_ids, repeat)
+        raw = await measure(load_raw, product_ids, repeat)
+    finally:
+        await dispose_database()
+
+    print(f"{len(product_ids)} rows x {repeat} queries, CPU time per row:")
+    print(f"  orm: {orm * 1e6:8.2f} us")
+    print(f"  raw: {raw * 1e6:8.2f} us ({orm / raw:.1f}x faster)")
+
+
+@cli.command()
+def main(
+    rows: Annotated[int, Option(min=1, help="Products per query")] = 100,
+    repeat: Annotated[int, Option(min=1, help="Queries per path")] = 200,
+) -> None:
+    asyncio.run(benchmark(rows=rows, repeat=repeat))
+
+
+if __name__ == "__main__":
+    cli()
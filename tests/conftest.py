@@ -0,0 +1,14 @@
+import os
+
+# configuration is read on import, only values required to import the app are set
+for _name, _value in {
+    "USER_ID_GLOBAL_TRENDS": "1",
+    "USER_ID_GLOBAL_BRANDS": "2",
+    "USER_ID_PERSONAL_TRENDS": "3",
+    "USER_ID_PERSONAL_BRANDS": "4",
+    "IMAGE_DIR": "/images/",  # matches .env.example, never accessed
+    "ELASTIC_HOST": "http://localhost:9200",
+    "ELASTIC_USERNAME": "elastic",
+    "ELASTIC_PASSWORD": "elastic",
+}.items():
+    os.environ.setdefault(_name, _value)
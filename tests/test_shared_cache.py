@@ -0,0 +1,72 @@
+import asyncio
+from uuid import UUID, uuid4
+
+from app.database import REPLICA_SESSION_INFO_KEY
+from app.model import CollectionCreate
+from app.service import CollectionService
+from app.service.cache import SharedCache
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def all(self):
+        return self.rows
+
+
+class FakeSession:
+    """Returns the given collection ids for every query, ignores writes."""
+
+    def __init__(self, collection_ids, *, replica=False):
+        self.collection_ids = collection_ids
+        self.info = {REPLICA_SESSION_INFO_KEY: replica}
+
+    async def exec(self, _statement):
+        return FakeResult(self.collection_ids)
+
+    def add(self, _instance):
+        pass
+
+    async def flush(self):
+        pass
+
+    async def refresh(self, _instance):
+        pass
+
+
+def get_ids(session, owner_id):
+    return asyncio.run(CollectionService.get_ids_by_owner(session=session, owner_id=owner_id))
+
+
+def test_create_invalidates_and_replica_reads_are_not_cached():
+    owner_id = 1001
+    first, second = uuid4(), uuid4()
+
+    assert get_ids(FakeSession([first]), owner_id) == {first}
+    assert CollectionService.collection_ids_cache.peek(owner_id) == {first}
+
+    asyncio.run(
+        CollectionService.create(
+            session=FakeSession([]),
+            owner_id=owner_id,
+            collection_create=CollectionCreate(name="new", cover_image_url="cover"),
+        )
+    )
+    assert CollectionService.collection_ids_cache.peek(owner_id) is None
+
+    # lagging replica has not seen the new collection yet
+    assert get_ids(FakeSession([first], replica=True), owner_id) == {first}
+    assert CollectionService.collection_ids_cache.peek(owner_id) is None
+
+    assert get_ids(FakeSession([first, second]), owner_id) == {first, second}
+    assert CollectionService.collection_ids_cache.peek(owner_id) == {first, second}
+
+
+def test_invalidation_notification_drops_keys_on_other_workers():
+    owner_id = 1002
+    CollectionService.collection_ids_cache.set(owner_id, frozenset({UUID(int=1)}))
+
+    SharedCache.handle_invalidation_notification(cache_name="collection_ids", keys=[owner_id])
+
+    assert CollectionService.collection_ids_cache.peek(owner_id) is None